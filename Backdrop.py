@@ -0,0 +1,104 @@
+"""
+Static scene layers baked into one image.
+
+bake(scene, grid, code) renders those mobjects once, over a transparent
+background, into a frame-sized image and puts the image in the scene where
+they were. Every frame after that draws one image for all of them, however
+many grid lines and glyphs they hold; only what changes (the framebuffer,
+labels, the highlighted code line) is still drawn as mobjects, on top.
+
+manim already reuses unmoving mobjects within a single play(), but every
+play() and wait() starts by rendering the whole scene again, and the paced
+scenes make thousands of those calls.
+
+Baked images are cached on disk, keyed by the layers' geometry and style
+and the render resolution, so rendering an unchanged scene again skips
+even the one-off rasterization.
+
+    RASTER_BACKDROP_CACHE   cache directory (default ~/.cache/raster/backdrop)
+"""
+import hashlib
+import os
+
+from manim import *
+from manim import __version__ as manim_version
+from manim.camera.camera import Camera
+from Profiler import phase
+
+CACHE_DIR = os.environ.get(
+    "RASTER_BACKDROP_CACHE", os.path.join(os.path.expanduser("~"), ".cache", "raster", "backdrop")
+)
+
+
+def _key(layers, frame_center):
+    """Hash of everything that decides how the layers rasterize."""
+    digest = hashlib.sha256(repr((
+        manim_version, config.pixel_width, config.pixel_height,
+        config.frame_width, config.frame_height, tuple(frame_center),
+    )).encode("utf-8"))
+    for layer in layers:
+        for mob in layer.get_family():
+            digest.update(type(mob).__name__.encode("utf-8"))
+            digest.update(np.ascontiguousarray(mob.points, dtype=np.float64).tobytes())
+            if isinstance(mob, VMobject):
+                digest.update(np.asarray(mob.get_fill_rgbas(), dtype=np.float64).tobytes())
+                digest.update(np.asarray(mob.get_stroke_rgbas(), dtype=np.float64).tobytes())
+                digest.update(repr(mob.get_stroke_width()).encode("utf-8"))
+            elif isinstance(mob, ImageMobject):
+                digest.update(np.ascontiguousarray(mob.pixel_array).tobytes())
+    return digest.hexdigest()
+
+
+def _render(layers, frame_center):
+    """RGBA uint8 frame of just the layers, straight (not premultiplied) alpha."""
+    camera = Camera(frame_center=frame_center, background_opacity=0)
+    camera.capture_mobjects(layers)
+
+    # Cairo leaves colour premultiplied by alpha; images are composited as straight alpha
+    rgba = camera.pixel_array.astype(np.float64)
+    alpha = rgba[..., 3:]
+    rgba[..., :3] = np.where(alpha > 0, rgba[..., :3] * 255 / np.maximum(alpha, 1), 0)
+    return np.rint(rgba).clip(0, 255).astype(np.uint8)
+
+
+def _pixels(layers, frame_center):
+    key = _key(layers, frame_center)
+    path = os.path.join(CACHE_DIR, key + ".npy")
+    try:
+        return np.load(path)
+    except (FileNotFoundError, ValueError, OSError):
+        pixels = _render(layers, frame_center)
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp.npy"
+        np.save(tmp, pixels)
+        os.replace(tmp, path)   # atomic, so parallel renders never see half a file
+        return pixels
+
+
+@phase("bake")
+def bake(scene, *layers):
+    """
+    Replace `layers` in `scene` with one image of them and return it.
+
+    The image takes the place of the lowest layer in the scene, so what was
+    drawn over the layers still is. A layer with an on_bake(scene) method
+    (CodePanel) is told first, so it can put itself in its static state.
+    """
+    for layer in layers:
+        if hasattr(layer, "on_bake"):
+            layer.on_bake(scene)
+
+    frame_center = scene.camera.frame_center
+    image = ImageMobject(_pixels(layers, frame_center))
+    image.set_resampling_algorithm(RESAMPLING_ALGORITHMS["nearest"])
+    image.stretch_to_fit_width(config.frame_width)
+    image.stretch_to_fit_height(config.frame_height)
+    image.move_to(frame_center)
+
+    placed = [scene.mobjects.index(layer) for layer in layers if layer in scene.mobjects]
+    scene.remove(*layers)
+    if placed:
+        scene.mobjects.insert(min(placed), image)
+    else:
+        scene.add(image)
+    return image
@@ -1,11 +1,17 @@
+from itertools import islice
+
 from manim import *
 from Stacklib import *
+from Grid import Grid, PixelGrid
+from Tracelib import BOUNDARY_FILL_CODE, iter_boundary_fill
+from Codepanel import CodePanel
+from Backdrop import bake
+from Pacing import Pacing
 
 rows, cols = 70, 30
 
 def set_pixel(grid, i, j, color=WHITE, opacity=1):
-    index = i * cols + j
-    grid[index].set_fill(color=color, opacity=opacity)
+    grid.set_pixel(i, j, color=color, opacity=opacity)
 
 def rectangle(grid, x1, y1, x2, y2):
     # Top edge
@@ -22,25 +28,11 @@ def rectangle(grid, x1, y1, x2, y2):
         set_pixel(grid, x2, y)
 
 def get_pixel_color(grid, i, j):
-    if 0 <= i < rows and 0 <= j < cols:
-        index = i * cols + j
-        return grid[index].get_fill_color().to_hex().upper()
-    return None
-
-def color_to_hex(color):
-    """Convert a manim color constant to uppercase hex string for reliable comparison."""
-    return ManimColor(color).to_hex().upper()
-
-def boundaryfill(grid, scene, x, y, boundary_color, fill_color=BLUE, delay=0.3):
-    boundary_hex = color_to_hex(boundary_color)
-    fill_hex     = color_to_hex(fill_color)
-
-    start_hex = get_pixel_color(grid, x, y)
-    # Don't fill if starting on boundary or already filled
-    if start_hex is None or start_hex == boundary_hex or start_hex == fill_hex:
-        return
+    """Palette index of pixel (i, j), or None off the grid."""
+    return grid.get_index(i, j)
 
-    # Create visual stack — start empty
+def make_fill_stack(scene):
+    """Visual stack the fills mirror their seed stack on — starts empty."""
     stack = ManimStack(
         box_width=2.5,
         box_height=0.4,
@@ -53,104 +45,201 @@ def boundaryfill(grid, scene, x, y, boundary_color, fill_color=BLUE, delay=0.3):
     stack_vgroup = stack.make_stack(initial_count=0)
     scene.add(stack_vgroup)
     stack.set_scene(scene)
+    return stack
+
+def part_range(total, part):
+    """Iterations [start, stop) of part (k, n): the k-th of n near-equal runs of `total`."""
+    k, n = part
+    return total * k // n, total * (k + 1) // n
+
+def count_pops(grid, x, y, boundary_id, fill_id):
+    """How many times boundaryfill pops its stack, run headlessly on the index plane."""
+    steps = iter_boundary_fill(grid.index, x, y, boundary_id, fill_id)
+    return sum("pop" in step.values for step in steps)
+
+def group_pops(steps):
+    """A boundary-fill stepper's steps, one list per stack pop and the pushes it leads to."""
+    group = []
+    for step in steps:
+        if "pop" in step.values and group:
+            yield group
+            group = []
+        group.append(step)
+    if group:
+        yield group
+
+def boundaryfill(grid, scene, x, y, boundary_color, fill_color=BLUE, delay=0.3, mode="pixel", pace=None, part=None):
+    """
+    4-connected boundary fill, animated from Tracelib.iter_boundary_fill run
+    on the grid's index plane; mode="span" switches to scanline_fill. The
+    stepper's pushes and pops are mirrored on a ManimStack.
+
+    part=(k, n) animates only the k-th of n equal runs of stack pops, so
+    one long fill can be rendered as n videos in parallel. The pops of the
+    earlier parts are replayed without animation first (pixels filled, the
+    stack settled in one instant batch, the budget muted), which leaves the
+    frame the previous part ended on.
+    """
+    if mode == "span":
+        if part is not None:
+            raise ValueError("span fills cannot be rendered in parts")
+        return scanline_fill(grid, scene, x, y, boundary_color, fill_color, delay, pace=pace)
+
+    boundary_id = grid.color_index(boundary_color)
+    fill_id     = grid.color_index(fill_color)
+
+    # The stepper fills a copy, so count the pops before it starts on the grid
+    first, last = (0, None) if part is None else part_range(count_pops(grid, x, y, boundary_id, fill_id), part)
+
+    steps = iter_boundary_fill(grid.index, x, y, boundary_id, fill_id, color=fill_color)
+    seed = next(steps)
+    # Don't fill if starting off the grid, on the boundary or already filled
+    if "push" not in seed.values:
+        return
 
-    # Seed both the logic stack and the visual stack
-    logic_stack = [(x, y)]
-    stack.add_element(f"({x},{y})")
+    stack = make_fill_stack(scene)
+    pace = pace or Pacing(scene)
+
+    def visit(group):
+        for step in group:
+            if "pop" in step.values:
+                stack.pop_element()              # visual pop always matches logic pop
+            for i, j, color in step.pixels:
+                set_pixel(grid, i, j, color=color)
+            if "push" in step.values:
+                stack.add_element("({},{})".format(*step.values["push"]))
+
+    pops = group_pops(steps)
+    if first == 0:
+        visit([seed])
+    else:
+        with stack.batch(run_time=0), pace.muted():
+            visit([seed])
+            for group in islice(pops, first):
+                pace.tick()
+                pace.run_time(1)
+                visit(group)
+                pace.wait(delay)
+
+    for group in islice(pops, None if last is None else last - first):
+        pace.tick()
+
+        # The pop and the pushes it leads to play as one stack animation
+        with stack.batch(run_time=pace.run_time(1)):
+            visit(group)
+
+        pace.wait(delay)
+
+    pace.flush()
+
+def scanline_fill(grid, scene, x, y, boundary_color, fill_color=BLUE, delay=0.3, show_stack=True, pace=None):
+    """
+    Span-based boundary fill.
+
+    Each popped seed is grown left and right into a full horizontal run,
+    which is filled in one write. Then one seed is pushed per run of
+    fillable pixels in the rows above and below. The stack (and the
+    ManimStack mirroring it when show_stack is set) holds one entry per
+    span instead of one per pixel.
+    """
+    boundary_id = grid.color_index(boundary_color)
+    fill_id     = grid.color_index(fill_color)
+
+    start_id = get_pixel_color(grid, x, y)
+    if start_id is None or start_id == boundary_id or start_id == fill_id:
+        return
 
-    while logic_stack:
-        current_x, current_y = logic_stack.pop()
-        stack.pop_element()                          # visual pop always matches logic pop
+    def fillable(i, j):
+        # Off-grid reads as None, and boundary/fill indices differ from start_id
+        return get_pixel_color(grid, i, j) == start_id
 
-        # Out-of-bounds guard
-        if not (0 <= current_x < rows and 0 <= current_y < cols):
-            continue
+    stack = make_fill_stack(scene) if show_stack else None
+    pace = pace or Pacing(scene)
 
-        current_hex = get_pixel_color(grid, current_x, current_y)
+    seeds = [(x, y)]
+    if stack:
+        stack.add_element(f"({x},{y})")
 
-        # Skip boundary pixels
-        if current_hex == boundary_hex:
-            continue
-
-        # Skip already-filled pixels
-        if current_hex == fill_hex:
-            continue
+    while seeds:
+        pace.tick()
+        seed_x, seed_y = seeds.pop()
 
-        # Skip pixels that are not the interior colour
-        if current_hex != start_hex:
+        # A span filled since this seed was pushed may already cover it
+        if not fillable(seed_x, seed_y):
+            if stack:
+                with stack.batch(run_time=pace.run_time(1)):
+                    stack.pop_element()
             continue
 
-        # Fill this pixel
-        set_pixel(grid, current_x, current_y, color=fill_color)
-        scene.wait(delay)
-
-        # Push valid (unfilled, non-boundary, in-bounds) neighbours
-        neighbors = [
-            (current_x + 1, current_y),
-            (current_x - 1, current_y),
-            (current_x,     current_y + 1),
-            (current_x,     current_y - 1),
-        ]
-
-        # Reverse so the first neighbour ends up on top of the stack
-        for nx, ny in reversed(neighbors):
-            if not (0 <= nx < rows and 0 <= ny < cols):
-                continue
-            nhex = get_pixel_color(grid, nx, ny)
-            if nhex != boundary_hex and nhex != fill_hex and nhex == start_hex:
-                logic_stack.append((nx, ny))
-                stack.add_element(f"({nx},{ny})")
+        left = seed_x
+        while fillable(left - 1, seed_y):
+            left -= 1
+        right = seed_x
+        while fillable(right + 1, seed_y):
+            right += 1
+
+        span = np.arange(left, right + 1)
+        grid.set_pixels(span, np.full(span.size, seed_y), color=fill_color)
+
+        # One seed per run of fillable pixels directly above and below
+        pushed = []
+        for ny in (seed_y - 1, seed_y + 1):
+            i = left
+            while i <= right:
+                if not fillable(i, ny):
+                    i += 1
+                    continue
+                seeds.append((i, ny))
+                pushed.append(f"({i},{ny})")
+                while i <= right and fillable(i, ny):
+                    i += 1
+
+        # The pop and its pushes play as one stack animation
+        if stack:
+            with stack.batch(run_time=pace.run_time(1)):
+                stack.pop_element()
+                for label in pushed:
+                    stack.add_element(label)
+        pace.wait(delay)
+
+    pace.flush()
 
 
 class Boundary(Scene):
+    fill_mode = "pixel"
+    part = None    # (k, n): render only the k-th of n sections of the fill
+
     def construct(self):
-        grid = VGroup()
-        pixelwidth = 0.2
-
-        # Create pixel grid
-        for i in range(rows):
-            for j in range(cols):
-                grid.add(
-                    Square(pixelwidth)
-                    .set_stroke(color=WHITE, opacity=1, width=0.5)
-                    .move_to([i * pixelwidth, j * pixelwidth, 0])
-                    .set_fill(color=BLACK, opacity=1)
-                )
+        # Grid lines over an opaque black framebuffer
+        lines_grid = Grid(rows, cols)
+        grid = PixelGrid(rows, cols, background=BLACK, background_opacity=1)
 
         # Display boundary-fill pseudocode
-        code = VGroup()
-        PREFIX = "●"
-        lines = [
-            "void boundaryFill(x, y, boundaryColor, fillColor) {",
-            "    color = getpixel(x, y);",
-            "    if (color == boundaryColor || color == fillColor)",
-            "        return;",
-            "    putpixel(x, y, fillColor);",
-            "    boundaryFill(x+1, y, boundaryColor, fillColor);",
-            "    boundaryFill(x-1, y, boundaryColor, fillColor);",
-            "    boundaryFill(x, y+1, boundaryColor, fillColor);",
-            "    boundaryFill(x, y-1, boundaryColor, fillColor);",
-            "}",
-        ]
-
-        for line in lines:
-            text = Text(
-                PREFIX + line,
-                font="Monospace",
-                font_size=9,
-                color=WHITE
-            )
-            text[0].set_opacity(0)
-            code.add(text)
-
-        code.arrange(DOWN, aligned_edge=LEFT, buff=0.2)
-        code.to_edge(LEFT).to_edge(UP, buff=0.5)
-
-        self.add(grid)
+        code = CodePanel(BOUNDARY_FILL_CODE)
+
+        self.add(grid, lines_grid)
         self.add(code)
+        bake(self, lines_grid, code)
 
         # Draw a WHITE rectangle, then fill its BLACK interior with BLUE
         rectangle(grid, 0, 0, 5, 4)
-        boundaryfill(grid, self, 2, 2, boundary_color=WHITE, fill_color=BLUE)
+        boundaryfill(grid, self, 2, 2, boundary_color=WHITE, fill_color=BLUE, mode=self.fill_mode, part=self.part)
+
+        if self.part is None or self.part[0] == self.part[1] - 1:
+            self.wait(5)
+
+
+class SpanBoundary(Boundary):
+    """Same scene, filled one horizontal span per stack entry."""
+    fill_mode = "span"
+
+
+# The fill in three sections, for final.py to render in parallel and stitch
+class BoundaryPart1(Boundary):
+    part = (0, 3)
+
+class BoundaryPart2(Boundary):
+    part = (1, 3)
 
-        self.wait(5)
\ No newline at end of file
+class BoundaryPart3(Boundary):
+    part = (2, 3)
@@ -1,145 +1,95 @@
 from manim import *
-from Grid import Grid
+from Grid import Grid, PixelGrid, ViewportGrid
+from Tracelib import CIRCLE_CODE, iter_circle
+from Rasterlib import clip_circle
+from Textcache import cached_text
+from Codepanel import CodePanel
+from Backdrop import bake
+from Pacing import Pacing
 
 rows, cols = 70, 30
 
-def set_pixel(grid, i, j, cols, color=WHITE, opacity=1):
-    index = i * cols + j
-    grid[index].set_fill(color=color, opacity=opacity)
+def set_pixel(grid, i, j, color=WHITE, opacity=1):
+    grid.set_pixel(i, j, color=color, opacity=opacity)
 
-def draw_circle_pixels(grid, scene, code_lines, xc, yc, x, y):
-    """Draw all 8 symmetric pixels for a circle with individual highlighting"""
-    
-    # Define all 8 pixel positions with their corresponding code lines
-    pixel_positions = [
-        (xc + x, yc + y, 4),   # putpixel(xc + x, yc + y)
-        (xc - x, yc + y, 5),   # putpixel(xc - x, yc + y)
-        (xc + x, yc - y, 6),   # putpixel(xc + x, yc - y)
-        (xc - x, yc - y, 7),   # putpixel(xc - x, yc - y)
-        (xc + y, yc + x, 8),   # putpixel(xc + y, yc + x)
-        (xc - y, yc + x, 9),   # putpixel(xc - y, yc + x)
-        (xc + y, yc - x, 10),  # putpixel(xc + y, yc - x)
-        (xc - y, yc - x, 11),  # putpixel(xc - y, yc - x)
-    ]
-    
-    for px, py, line_num in pixel_positions:
-        # Highlight the specific line for this pixel
-        scene.highlight_code_line(code_lines, line_num)
-        set_pixel(grid, px, py, cols, color=BLUE, opacity=1)
-        scene.wait(0.2)  # Small delay to see each pixel being placed
+def octant_pixel(xc, yc, x, y, octant):
+    """Pixel `octant` of step (x, y), in Tracelib.iter_circle's putpixel order."""
+    return [
+        (xc + x, yc + y), (xc - x, yc + y), (xc + x, yc - y), (xc - x, yc - y),
+        (xc + y, yc + x), (xc - y, yc + x), (xc + y, yc - x), (xc - y, yc - x),
+    ][octant]
 
-def midpoint_circle(scene, code_lines, grid, xc, yc, r):
-    """Implement midpoint circle algorithm with visualization"""
-    x = 0
-    y = r
-    d = 1 - r  # Initial decision parameter
-    
-    # Create large P value display at bottom center
-    p_display = Text(f"P = {d}", font="Monospace", font_size=36, color=GREEN, weight=BOLD)
-    p_display.to_edge(DOWN, buff=0.8)
-    scene.add(p_display)
-    
-    # Create small x and y display below P (or above, whichever looks better)
-    xy_display = Text(f"x = {x}    y = {y}", font="Monospace", font_size=18, color=WHITE)
-    xy_display.next_to(p_display, UP, buff=0.3)
-    scene.add(xy_display)
-    
-    while x <= y:
-        # Highlight while loop condition
-        scene.highlight_code_line(code_lines, 3)
-        scene.wait(0.3)
-        
-        # Draw all 8 symmetric pixels with individual highlighting
-        scene.highlight_code_line(code_lines, 4)  # First pixel line to start
-        draw_circle_pixels(grid, scene, code_lines, xc, yc, x, y)
-        
-        # Update displays
-        p_display.become(Text(f"P = {d}", font="Monospace", font_size=36, color=GREEN, weight=BOLD))
-        p_display.to_edge(DOWN, buff=0.8)
-        xy_display.become(Text(f"x = {x}    y = {y}", font="Monospace", font_size=18, color=WHITE))
-        xy_display.next_to(p_display, UP, buff=0.3)
-        
-        # Check decision parameter (no text display, just highlight)
-        scene.highlight_code_line(code_lines, 12)
-        scene.wait(0.6)
-        
-        if d < 0:
-            scene.highlight_code_line(code_lines, 13)
-            d += 2 * x + 3
-            scene.wait(0.5)
-        else:
-            scene.highlight_code_line(code_lines, 15)
-            d += 2 * (x - y) + 5
-            scene.wait(0.4)
-            
-            scene.highlight_code_line(code_lines, 16)
-            y -= 1
-            scene.wait(0.5)
-        
-        scene.highlight_code_line(code_lines, 18)
-        x += 1
-        scene.wait(0.5)
-    
+def midpoint_circle(scene, code, grid, xc, yc, r, pace=None, follow=None):
+    """
+    Animate Tracelib.iter_circle, clipped to the grid: each of a step's 8
+    symmetric pixels gets its own putpixel line, off-grid octants are left
+    out and steps with none on the grid are jumped over.
+    follow (an octant, in putpixel order) has a ViewportGrid pan to keep
+    that octant's pixel in view, one pan decision per step.
+    """
+    drawn = clip_circle(xc, yc, r, grid.rows, grid.cols)[2].any(axis=1)
+    pace = pace or Pacing(scene, total=int(drawn.sum()))
+    p_display = xy_display = None
+    state = {}
+
+    for step in iter_circle(xc, yc, r, size=(grid.rows, grid.cols)):
+        state.update(step.values)
+        if step.line == 3:
+            pace.tick()
+            if follow is not None:
+                grid.follow(*octant_pixel(xc, yc, state["x"], state["y"], follow))
+        code.highlight(step.line)
+        for i, j, color in step.pixels:
+            set_pixel(grid, i, j, color=color)
+
+        if step.line == 12:
+            # The step's pixels are in: show the P, x and y they were drawn with
+            p_text = cached_text(f"P = {state['P']}", font="Monospace", font_size=36, color=GREEN, weight=BOLD)
+            xy_text = cached_text(f"x = {state['x']}    y = {state['y']}", font="Monospace", font_size=18, color=WHITE)
+            if p_display is None:
+                p_display, xy_display = p_text, xy_text
+                scene.add(p_display, xy_display)
+            else:
+                p_display.become(p_text)
+                xy_display.become(xy_text)
+            p_display.to_edge(DOWN, buff=0.8)
+            xy_display.next_to(p_display, UP, buff=0.3)
+        pace.wait(step.wait)
+
+    pace.flush()
     scene.wait(2)
 
 class GridCircle(Scene):
-    def highlight_code_line(self, code_lines, line_number):
-        """Highlight a specific line in the code block"""
-        for i, line in enumerate(code_lines, start=1):
-            line.set_color(YELLOW if i == line_number else WHITE)
-            line.set_opacity(1 if i == line_number else 0.5)
-    
     def construct(self):
-        # Create grid using Grid library
+        # Create grid lines and the framebuffer they sit on
         grid = Grid(rows, cols)
+        pixels = PixelGrid(rows, cols)
         
         # Create code block
-        code = VGroup()
+        code = CodePanel(CIRCLE_CODE)
         
-        PREFIX = "●"  # forces spaces to be non-leading
-        lines = [
-            "void circle(int xc, int yc, int r) {",                    #1
-            "   int x = 0, y = r, d = 1 - r;",                        #2
-            "   while (x <= y) {",                                    #3
-            "      putpixel(xc + x, yc + y);",                        #4
-            "      putpixel(xc - x, yc + y);",                        #5
-            "      putpixel(xc + x, yc - y);",                        #6
-            "      putpixel(xc - x, yc - y);",                        #7
-            "      putpixel(xc + y, yc + x);",                        #8
-            "      putpixel(xc - y, yc + x);",                        #9
-            "      putpixel(xc + y, yc - x);",                        #10
-            "      putpixel(xc - y, yc - x);",                        #11
-            "      if (d < 0) {",                                     #12
-            "         d += 2 * x + 3;",                               #13
-            "      } else {",                                         #14
-            "         d += 2 * (x - y) + 5;",                         #15
-            "         y--;",                                          #16
-            "      }",                                                #17
-            "      x++;",                                             #18
-            "   }",                                                   #19
-            "}",                                                      #20
-        ]
+        # Add grid and code to scene
+        self.add(pixels, grid, code)
+        bake(self, grid, code)
+        self.wait(2)
         
-        for line in lines:
-            text = Text(
-                PREFIX + line,
-                font="Monospace",
-                font_size=9,
-                color=WHITE
-            )
-            # hide the prefix so indentation works
-            text[0].set_opacity(0)
-            code.add(text)
+        # Run the circle algorithm with center at (6, 6) and radius 5
+        midpoint_circle(self, code, pixels, 6, 6, 5)
         
-        # Arrange lines with perfect left alignment
-        code.arrange(DOWN, aligned_edge=LEFT, buff=0.2)
-        code.to_edge(LEFT).to_edge(UP, buff=0.5)
+        self.wait(5)
+
+class GridCircleViewport(Scene):
+    """Radius-1500 circle on a 4096x4096 canvas, seen through a window that follows the pen."""
+    def construct(self):
+        grid = Grid(rows, cols)
+        # The eight octants write far apart; the window follows the first one only
+        canvas = ViewportGrid(4096, 4096, rows, cols, auto_follow=False)
+        code = CodePanel(CIRCLE_CODE)
         
-        # Add grid and code to scene
-        self.add(grid, code)
+        self.add(canvas, grid, code)
+        bake(self, grid, code)
         self.wait(2)
         
-        # Run the circle algorithm with center at (6, 6) and radius 5
-        midpoint_circle(self, code, grid, 6, 6, 5)
+        midpoint_circle(self, code, canvas, 2048, 2048, 1500, follow=0)
         
         self.wait(5)
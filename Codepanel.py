@@ -0,0 +1,66 @@
+from manim import *
+from Textcache import cached_text
+from Profiler import phase
+
+class CodePanel(VGroup):
+    """
+    Pseudocode listing, one Text per line, with a single highlighted line.
+
+    Lines are prefixed with a hidden "●" so leading spaces survive layout.
+    highlight(n) only restyles the line it leaves and the line it lands on,
+    so moving the highlight costs the same however long the listing is;
+    only the very first call dims the whole panel.
+
+    Baked into a Backdrop, the panel itself leaves the scene: the image
+    holds every line dimmed, and highlight(n) adds just line n to the
+    scene, drawn over its dim copy.
+    """
+
+    @phase("code_panel")
+    def __init__(self, lines, font_size=9, buff=0.2, color=WHITE,
+                 highlight_color=YELLOW, dim_opacity=0.5):
+        super().__init__()
+        self.color_normal = color
+        self.highlight_color = highlight_color
+        self.dim_opacity = dim_opacity
+        self.current = None   # 1-based number of the highlighted line
+        self.overlay = None   # scene the highlighted line is drawn in, once baked
+
+        for line in lines:
+            text = cached_text("●" + line, font="Monospace", font_size=font_size, color=color)
+            text[0].set_opacity(0)
+            self.add(text)
+
+        self.arrange(DOWN, aligned_edge=LEFT, buff=buff)
+        self.to_edge(LEFT).to_edge(UP, buff=0.5)
+
+    def _style(self, line_number, active):
+        glyphs = self[line_number - 1][1:]   # leave the prefix hidden
+        glyphs.set_color(self.highlight_color if active else self.color_normal)
+        glyphs.set_opacity(1 if active else self.dim_opacity)
+
+    @phase("highlight")
+    def highlight(self, line_number):
+        if self.current is None:
+            if self.overlay is None:
+                for i in range(1, len(self) + 1):
+                    self._style(i, i == line_number)
+            else:
+                self._style(line_number, True)   # on_bake already dimmed the rest
+        elif line_number != self.current:
+            self._style(self.current, False)
+            self._style(line_number, True)
+
+        if self.overlay is not None and line_number != self.current:
+            if self.current is not None:
+                self.overlay.remove(self[self.current - 1])
+            self.overlay.add(self[line_number - 1])
+        self.current = line_number
+        return self
+
+    def on_bake(self, scene):
+        """Dim every line for the baked image; highlights are drawn on top from now on."""
+        for i in range(1, len(self) + 1):
+            self._style(i, False)
+        self.current = None
+        self.overlay = scene
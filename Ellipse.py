@@ -1,294 +1,266 @@
 from manim import *
-from Grid import Grid
+from Grid import Grid, PixelGrid
+from Tracelib import (
+    ELLIPSE_REGION1_CODE, ELLIPSE_REGION2_CODE, iter_ellipse_region1, iter_ellipse_region2, run_stepper,
+)
+from Rasterlib import clip_ellipse_region1
+from Textcache import cached_text, retext
+from Codepanel import CodePanel
+from Backdrop import bake
+from Pacing import Pacing
+from Profiler import phase
 
 rows, cols = 70, 40
 
-def set_pixel(grid, i, j, cols, color=WHITE, opacity=1):
-    index = i * cols + j
-    grid[index].set_fill(color=color, opacity=opacity)
+def set_pixel(grid, i, j, color=WHITE, opacity=1):
+    grid.set_pixel(i, j, color=color, opacity=opacity)
 
-def draw_ellipse_pixels(grid, scene, xc, yc, x, y):
+class LabelPool:
     """
-    Animate all 4 symmetric pixels one at a time.
+    Coordinate labels that float above pixels, one per symmetric position,
+    recycled across iterations. The grid's origin is read once; after
+    that a label only gets new glyph outlines and a new position.
+    """
+
+    def __init__(self, grid, size=4, font_size=8, color=YELLOW, offset=UP * 0.25):
+        self.origin = grid.pixel_center(0, 0) + offset
+        self.pixel = grid.pixel
+        self.font_size = font_size
+        self.color = color
+        self.labels = [None] * size
+
+    def show(self, slot, text, i, j):
+        """Label `slot` reading `text`, placed above pixel (i, j)."""
+        label = self.labels[slot]
+        if label is None:
+            label = self.labels[slot] = cached_text(text, font="Monospace", font_size=self.font_size, color=self.color)
+        else:
+            retext(label, text, font="Monospace", font_size=self.font_size, color=self.color)
+        return label.move_to(self.origin + self.pixel * np.array([i, j, 0.0]))
+
+@phase("draw_ellipse_pixels")
+def draw_ellipse_pixels(grid, scene, pace, labels, pixels):
+    """
+    Animate a step's symmetric pixels, (i, j, color) each, one at a time.
     Each pixel flashes YELLOW with a floating coordinate label,
-    then settles to WHITE.
-    Labels are drawn in scene-space so they sit just above the pixel.
+    then settles to its colour.
+    Labels come from a LabelPool and sit just above the pixel.
     """
-    pixel_size = 0.2          # must match Grid() pixel size
-    grid_origin = grid[0].get_center()   # position of pixel (0,0)
-
-    # The four symmetric positions and their labels
-    positions = [
-        (xc + x, yc + y, f"({xc+x},{yc+y})"),
-        (xc - x, yc + y, f"({xc-x},{yc+y})"),
-        (xc + x, yc - y, f"({xc+x},{yc-y})"),
-        (xc - x, yc - y, f"({xc-x},{yc-y})"),
-    ]
-
-    for pi, pj, label_str in positions:
+    for slot, (pi, pj, color) in enumerate(pixels):
         # --- flash pixel yellow ---
-        set_pixel(grid, pi, pj, cols, color=YELLOW, opacity=1)
+        set_pixel(grid, pi, pj, color=YELLOW, opacity=1)
 
         # --- floating coordinate label ---
-        # compute scene position of this pixel
-        px_center = grid_origin + np.array([pi * pixel_size, pj * pixel_size, 0])
-        coord_label = Text(label_str, font="Monospace", font_size=8, color=YELLOW)
-        coord_label.move_to(px_center + UP * 0.25)
+        coord_label = labels.show(slot, f"({pi},{pj})", pi, pj)
         scene.add(coord_label)
 
-        scene.wait(0.25)
+        pace.wait(0.25)
 
-        # --- settle to white, remove label ---
-        set_pixel(grid, pi, pj, cols, color=WHITE, opacity=1)
+        # --- settle, remove label ---
+        set_pixel(grid, pi, pj, color=color, opacity=1)
         scene.remove(coord_label)
-        scene.wait(0.05)
+        pace.wait(0.05)
+
+class Readout:
+    """
+    The decision parameter in large type at the bottom left, x and y
+    above it, and above those the check currently being made.
+    """
 
+    def __init__(self, scene, x, y, P):
+        self.scene = scene
+        self.p_display = cached_text(f"P = {P:.2f}", font="Monospace", font_size=36, color=GREEN, weight=BOLD)
+        self.p_display.to_edge(DOWN + LEFT, buff=0.8)
+        self.xy_display = cached_text(f"x = {x}    y = {y}", font="Monospace", font_size=18, color=WHITE)
+        self.place_xy()
+        self.cond_text = None
+        scene.add(self.p_display, self.xy_display)
+
+    def place_xy(self):
+        self.xy_display.next_to(self.p_display, UP, buff=0.3)
+        self.xy_display.align_to(self.p_display, LEFT)
+
+    def show_p(self, P):
+        self.p_display.become(cached_text(f"P = {P:.2f}", font="Monospace", font_size=36, color=GREEN, weight=BOLD))
+        self.p_display.to_edge(DOWN + LEFT, buff=0.8)
+
+    def show_xy(self, x, y):
+        self.xy_display.become(cached_text(f"x = {x}    y = {y}", font="Monospace", font_size=18, color=WHITE))
+        self.place_xy()
+
+    def show_changes(self, values, state):
+        """Redraw whichever of P and x, y a step changed; state holds their current values."""
+        if "P" in values:
+            self.show_p(state["P"])
+        if "x" in values or "y" in values:
+            self.show_xy(state["x"], state["y"])
+
+    def check(self, text):
+        self.cond_text = cached_text(text, font="Monospace", font_size=13, color=YELLOW)
+        self.cond_text.next_to(self.xy_display, UP, buff=0.3)
+        self.cond_text.align_to(self.p_display, LEFT)
+        self.scene.add(self.cond_text)
+
+    def clear(self):
+        """Remove the check; False if none was shown."""
+        if self.cond_text is None:
+            return False
+        self.scene.remove(self.cond_text)
+        self.cond_text = None
+        return True
+
+    def remove(self):
+        self.scene.remove(self.p_display, self.xy_display)
+
+@phase("show_code")
 def show_code(scene, lines, title):
-    """Create and display code block"""
-    code = VGroup()
-    for line in lines:
-        text = Text("●" + line, font="Monospace", font_size=9, color=WHITE)
-        text[0].set_opacity(0)
-        code.add(text)
-    code.arrange(DOWN, aligned_edge=LEFT, buff=0.15)
-    code.to_edge(LEFT).to_edge(UP, buff=0.5)
-
-    title_text = Text(title, font="Monospace", font_size=12, color=GREEN)
+    """Create and display code block, baked with its title; returns (code, backdrop)"""
+    code = CodePanel(lines, buff=0.15)
+
+    title_text = cached_text(title, font="Monospace", font_size=12, color=GREEN)
     title_text.next_to(code, DOWN, buff=0.2)
     title_text.align_to(code, LEFT)
 
     scene.add(code, title_text)
-    return code, title_text
-
-def highlight_line(scene, code_lines, line_num):
-    """Highlight specific line"""
-    for i, line in enumerate(code_lines, start=1):
-        line.set_color(YELLOW if i == line_num else WHITE)
-        line.set_opacity(1 if i == line_num else 0.5)
-
-def region1_algorithm(scene, grid, xc, yc, rx, ry):
-    """Region 1 of midpoint ellipse algorithm (slope magnitude < 1, i.e. |dy/dx| < 1)"""
-    region1_lines = [
-        "void ellipse(int xc, int yc, int rx, int ry) {",   # 1
-        "   int x=0, y=ry;",                                 # 2
-        "   int rx2=rx*rx, ry2=ry*ry;",                      # 3
-        "   float d1 = ry2 - rx2*ry + 0.25*rx2;",           # 4
-        "   // Region 1: 2*ry2*x < 2*rx2*y",                # 5
-        "   while (2*ry2*x < 2*rx2*y) {",                   # 6
-        "      putpixel(xc±x, yc±y);",                      # 7
-        "      if (d1 < 0) {",                               # 8
-        "         d1 += 2*ry2*x + 3*ry2;",                  # 9
-        "      } else {",                                    # 10
-        "         y--;",                                     # 11
-        "         d1 += 2*ry2*x - 2*rx2*y + 3*ry2 + 2*rx2;",# 12
-        "      }",                                           # 13
-        "      x++;",                                        # 14
-        "   }",                                              # 15
-        "}",                                                 # 16
-    ]
-
-    code, title = show_code(scene, region1_lines, "Region 1: |slope| < 1")
-
-    x = 0
-    y = ry
-    rx2 = rx * rx
-    ry2 = ry * ry
-    d1 = ry2 - rx2 * ry + 0.25 * rx2
-
-    # P value display
-    p_display = Text(f"P = {d1:.2f}", font="Monospace", font_size=36, color=GREEN, weight=BOLD)
-    p_display.to_edge(DOWN + LEFT, buff=0.8)
-    scene.add(p_display)
-
-    xy_display = Text(f"x = {x}    y = {y}", font="Monospace", font_size=18, color=WHITE)
-    xy_display.next_to(p_display, UP, buff=0.3)
-    xy_display.align_to(p_display, LEFT)
-    scene.add(xy_display)
+    return code, bake(scene, code, title_text)
 
+def region1_algorithm(scene, grid, xc, yc, rx, ry, pace=None, labels=None):
+    """
+    Region 1 of midpoint ellipse algorithm (slope magnitude < 1, i.e. |dy/dx| < 1),
+    animated from Tracelib.iter_ellipse_region1 clipped to the grid.
+    """
+    pace = pace or Pacing(scene)
+    labels = labels or LabelPool(grid)
+
+    # Only steps with a pixel on the grid; the handoff is the unclipped loop's
+    steps, handoff = run_stepper(iter_ellipse_region1(xc, yc, rx, ry, size=(grid.rows, grid.cols)))
+    if not steps:
+        return handoff
+
+    code, backdrop = show_code(scene, ELLIPSE_REGION1_CODE, "Region 1: |slope| < 1")
+    state = dict(steps[0].values)
+    readout = Readout(scene, **state)
     scene.wait(1)
 
-    while (2 * ry2 * x) < (2 * rx2 * y):
-        # Highlight while condition
-        highlight_line(scene, code, 6)
-        scene.wait(0.2)
-
-        # Draw pixel — one at a time with flash + label
-        highlight_line(scene, code, 7)
-        draw_ellipse_pixels(grid, scene, xc, yc, x, y)
-
-        # Update displays
-        p_display.become(Text(f"P = {d1:.2f}", font="Monospace", font_size=36, color=GREEN, weight=BOLD))
-        p_display.to_edge(DOWN + LEFT, buff=0.8)
-        xy_display.become(Text(f"x = {x}    y = {y}", font="Monospace", font_size=18, color=WHITE))
-        xy_display.next_to(p_display, UP, buff=0.3)
-        xy_display.align_to(p_display, LEFT)
-
-        # Check condition
-        highlight_line(scene, code, 8)
-        cond_text = Text(
-            f"d1 {'<' if d1 < 0 else '>='} 0  ({d1:.2f})",
-            font="Monospace", font_size=13, color=YELLOW
-        )
-        cond_text.next_to(xy_display, UP, buff=0.3)
-        cond_text.align_to(p_display, LEFT)
-        scene.add(cond_text)
-        scene.wait(0.4)
-
-        if d1 < 0:
-            highlight_line(scene, code, 9)
-            old_d = d1
-            d1 += 2 * ry2 * x + 3 * ry2
-            p_display.become(Text(f"P = {d1:.2f}", font="Monospace", font_size=36, color=GREEN, weight=BOLD))
-            p_display.to_edge(DOWN + LEFT, buff=0.8)
-            scene.wait(0.3)
-        else:
-            highlight_line(scene, code, 11)
-            y -= 1
-            xy_display.become(Text(f"x = {x}    y = {y}", font="Monospace", font_size=18, color=WHITE))
-            xy_display.next_to(p_display, UP, buff=0.3)
-            xy_display.align_to(p_display, LEFT)
-            scene.wait(0.2)
-
-            highlight_line(scene, code, 12)
-            d1 += 2 * ry2 * x - 2 * rx2 * y + 3 * ry2 + 2 * rx2
-            p_display.become(Text(f"P = {d1:.2f}", font="Monospace", font_size=36, color=GREEN, weight=BOLD))
-            p_display.to_edge(DOWN + LEFT, buff=0.8)
-            scene.wait(0.3)
-
-        scene.remove(cond_text)
-        highlight_line(scene, code, 14)
-        x += 1
-
-        xy_display.become(Text(f"x = {x}    y = {y}", font="Monospace", font_size=18, color=WHITE))
-        xy_display.next_to(p_display, UP, buff=0.3)
-        xy_display.align_to(p_display, LEFT)
-        scene.wait(0.3)
-
-    scene.remove(code, title)
-    scene.remove(p_display, xy_display)
-    return x, y, rx2, ry2
-
-
-def region2_algorithm(scene, grid, xc, yc, rx, ry, x, y, rx2, ry2):
-    """Region 2 of midpoint ellipse algorithm (slope magnitude > 1, i.e. |dy/dx| > 1)"""
-    region2_lines = [
-        "   // Region 2: 2*ry2*x >= 2*rx2*y",               # 1
-        "   float d2 = ry2*(x+0.5)*(x+0.5)",                 # 2
-        "          + rx2*(y-1)*(y-1) - rx2*ry2;",            # 3
-        "   while (y >= 0) {",                               # 4
-        "      putpixel(xc±x, yc±y);",                      # 5
-        "      if (d2 > 0) {",                               # 6
-        "         y--;",                                     # 7
-        "         d2 += -2*rx2*y + 3*rx2;",                  # 8
-        "      } else {",                                    # 9
-        "         x++;",                                     # 10
-        "         y--;",                                     # 11
-        "         d2 += 2*ry2*x - 2*rx2*y + 3*rx2 + 2*ry2;",# 12
-        "      }",                                           # 13
-        "   }",                                              # 14
-    ]
-
-    code, title = show_code(scene, region2_lines, "Region 2: |slope| > 1")
-
-    # Calculate initial d2 for region 2
-    d2 = ry2 * (x + 0.5) * (x + 0.5) + rx2 * (y - 1) * (y - 1) - rx2 * ry2
-
-    # P value display
-    p_display = Text(f"P = {d2:.2f}", font="Monospace", font_size=36, color=GREEN, weight=BOLD)
-    p_display.to_edge(DOWN + LEFT, buff=0.8)
-    scene.add(p_display)
-
-    xy_display = Text(f"x = {x}    y = {y}", font="Monospace", font_size=18, color=WHITE)
-    xy_display.next_to(p_display, UP, buff=0.3)
-    xy_display.align_to(p_display, LEFT)
-    scene.add(xy_display)
+    for step in steps:
+        state.update(step.values)
+        if step.line == 6:
+            pace.tick()
+        if step.line == 14:
+            readout.clear()
+        code.highlight(step.line)
+
+        if step.line == 7:
+            # Draw pixel — one at a time with flash + label
+            draw_ellipse_pixels(grid, scene, pace, labels, step.pixels)
+            continue
+        if step.line == 8:
+            readout.show_p(state["P"])
+            readout.show_xy(state["x"], state["y"])
+            readout.check(f"d1 {'<' if state['P'] < 0 else '>='} 0  ({state['P']:.2f})")
+        elif step.line != 6:
+            readout.show_changes(step.values, state)
+        pace.wait(step.wait)
+
+    pace.flush()
+    scene.remove(backdrop, *code)
+    readout.remove()
+    return handoff
+
+
+def region1_pixels(grid, xc, yc, rx, ry):
+    """
+    Light the pixels region1_algorithm leaves on the grid, in one write and
+    without animating, and return its (x, y, rx2, ry2) handoff: everything
+    region 2 needs to start from.
+    """
+    xs, ys, visible, handoff = clip_ellipse_region1(xc, yc, rx, ry, grid.rows, grid.cols)
+    ii = np.column_stack([xc + xs, xc - xs, xc + xs, xc - xs])[visible]
+    jj = np.column_stack([yc + ys, yc + ys, yc - ys, yc - ys])[visible]
+    grid.set_pixels(ii, jj, color=WHITE)
+    return handoff
+
+
+def region2_algorithm(scene, grid, xc, yc, rx, ry, x, y, rx2, ry2, pace=None, labels=None):
+    """
+    Region 2 of midpoint ellipse algorithm (slope magnitude > 1, i.e. |dy/dx| > 1),
+    animated from Tracelib.iter_ellipse_region2 clipped to the grid.
+    """
+    pace = pace or Pacing(scene)
+    labels = labels or LabelPool(grid)
+
+    steps = list(iter_ellipse_region2(xc, yc, rx, ry, x, y, rx2, ry2, size=(grid.rows, grid.cols)))
+    if not steps:
+        return
 
+    code, backdrop = show_code(scene, ELLIPSE_REGION2_CODE, "Region 2: |slope| > 1")
+    state = dict(steps[0].values)
+    readout = Readout(scene, **state)
     scene.wait(1)
 
-    while y >= 0:
-        # Highlight while condition
-        highlight_line(scene, code, 4)
-        scene.wait(0.2)
-
-        # Draw pixel — one at a time with flash + label
-        highlight_line(scene, code, 5)
-        draw_ellipse_pixels(grid, scene, xc, yc, x, y)
-
-        # Update displays
-        p_display.become(Text(f"P = {d2:.2f}", font="Monospace", font_size=36, color=GREEN, weight=BOLD))
-        p_display.to_edge(DOWN + LEFT, buff=0.8)
-        xy_display.become(Text(f"x = {x}    y = {y}", font="Monospace", font_size=18, color=WHITE))
-        xy_display.next_to(p_display, UP, buff=0.3)
-        xy_display.align_to(p_display, LEFT)
-
-        # Check condition
-        highlight_line(scene, code, 6)
-        cond_text = Text(
-            f"d2 {'>' if d2 > 0 else '<='} 0  ({d2:.2f})",
-            font="Monospace", font_size=13, color=YELLOW
-        )
-        cond_text.next_to(xy_display, UP, buff=0.3)
-        cond_text.align_to(p_display, LEFT)
-        scene.add(cond_text)
-        scene.wait(0.4)
-
-        if d2 > 0:
-            # Only y decrements
-            highlight_line(scene, code, 7)
-            y -= 1
-            xy_display.become(Text(f"x = {x}    y = {y}", font="Monospace", font_size=18, color=WHITE))
-            xy_display.next_to(p_display, UP, buff=0.3)
-            xy_display.align_to(p_display, LEFT)
-            scene.wait(0.2)
-
-            highlight_line(scene, code, 8)
-            d2 += -2 * rx2 * y + 3 * rx2
-            p_display.become(Text(f"P = {d2:.2f}", font="Monospace", font_size=36, color=GREEN, weight=BOLD))
-            p_display.to_edge(DOWN + LEFT, buff=0.8)
-            scene.wait(0.3)
-        else:
-            # Both x increments and y decrements
-            highlight_line(scene, code, 10)
-            x += 1
-            xy_display.become(Text(f"x = {x}    y = {y}", font="Monospace", font_size=18, color=WHITE))
-            xy_display.next_to(p_display, UP, buff=0.3)
-            xy_display.align_to(p_display, LEFT)
-            scene.wait(0.2)
-
-            highlight_line(scene, code, 11)
-            y -= 1
-            xy_display.become(Text(f"x = {x}    y = {y}", font="Monospace", font_size=18, color=WHITE))
-            xy_display.next_to(p_display, UP, buff=0.3)
-            xy_display.align_to(p_display, LEFT)
-            scene.wait(0.2)
-
-            highlight_line(scene, code, 12)
-            d2 += 2 * ry2 * x - 2 * rx2 * y + 3 * rx2 + 2 * ry2
-            p_display.become(Text(f"P = {d2:.2f}", font="Monospace", font_size=36, color=GREEN, weight=BOLD))
-            p_display.to_edge(DOWN + LEFT, buff=0.8)
-            scene.wait(0.3)
-
-        scene.remove(cond_text)
-        scene.wait(0.1)
-
-    scene.remove(code, title)
-    scene.remove(p_display, xy_display)
+    for step in steps:
+        state.update(step.values)
+        if step.line == 4:
+            # A short pause with the last check cleared between iterations
+            if readout.clear():
+                pace.wait(0.1)
+            pace.tick()
+        code.highlight(step.line)
+
+        if step.line == 5:
+            # Draw pixel — one at a time with flash + label
+            draw_ellipse_pixels(grid, scene, pace, labels, step.pixels)
+            continue
+        if step.line == 6:
+            readout.show_p(state["P"])
+            readout.show_xy(state["x"], state["y"])
+            readout.check(f"d2 {'>' if state['P'] > 0 else '<='} 0  ({state['P']:.2f})")
+        elif step.line != 4:
+            readout.show_changes(step.values, state)
+        pace.wait(step.wait)
+
+    if readout.clear():
+        pace.wait(0.1)
+    pace.flush()
+    scene.remove(backdrop, *code)
+    readout.remove()
 
 
 class GridEllipse(Scene):
+    # 1 or 2 renders only that region, starting from the frame the other
+    # section ends on, so final.py can render the two in parallel
+    region = None
+
     def construct(self):
-        # Create grid
+        # Create grid lines and the framebuffer they sit on
         grid = Grid(rows, cols)
-        self.add(grid)
-        self.wait(1)
+        pixels = PixelGrid(rows, cols)
+        self.add(pixels, grid)
+        bake(self, grid)
 
         # Draw ellipse with center (35, 20), rx=12, ry=8 — fits in 70x40 grid
         xc, yc, rx, ry = 35, 20, 12, 8
 
-        # Region 1: starting from top of ellipse, moving right while |slope| < 1
-        x, y, rx2, ry2 = region1_algorithm(self, grid, xc, yc, rx, ry)
+        # Each region paces against its own half of the budget, so either
+        # one renders the same alone as after the other
+        labels = LabelPool(pixels)
+
+        if self.region != 2:
+            self.wait(1)
+            # Region 1: starting from top of ellipse, moving right while |slope| < 1
+            x, y, rx2, ry2 = region1_algorithm(self, pixels, xc, yc, rx, ry, Pacing(self, budget=15), labels)
+        else:
+            x, y, rx2, ry2 = region1_pixels(pixels, xc, yc, rx, ry)
+
+        if self.region != 1:
+            # Region 2: continuing from where region 1 stopped, moving down to rightmost point
+            region2_algorithm(self, pixels, xc, yc, rx, ry, x, y, rx2, ry2, Pacing(self, budget=15), labels)
+            self.wait(3)
+
+
+class GridEllipseRegion1(GridEllipse):
+    region = 1
 
-        # Region 2: continuing from where region 1 stopped, moving down to rightmost point
-        region2_algorithm(self, grid, xc, yc, rx, ry, x, y, rx2, ry2)
 
-        self.wait(3)
\ No newline at end of file
+class GridEllipseRegion2(GridEllipse):
+    region = 2
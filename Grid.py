@@ -1,13 +1,276 @@
 from manim import *
+from Profiler import phase
 
+def _check_bounds(ii, jj, rows, cols):
+    """
+    Raise IndexError unless every (ii[k], jj[k]) is a pixel of a rows x cols
+    grid. NumPy would wrap negative indices round to the far edge instead.
+    """
+    ii, jj = np.asarray(ii), np.asarray(jj)
+    if not np.all((0 <= ii) & (ii < rows) & (0 <= jj) & (jj < cols)):
+        raise IndexError(f"pixel off the {rows}x{cols} grid; clip it first (see Rasterlib.clip_*)")
+    return ii, jj
+
+def _segments(starts, ends):
+    """One VMobject holding a straight subpath from each start to its end."""
+    t = np.array([0, 1 / 3, 2 / 3, 1])[None, :, None]
+    points = starts[:, None, :] + t * (ends - starts)[:, None, :]
+    return VMobject().set_points(points.reshape(-1, 3))
+
+@phase("grid")
 def Grid(rows, cols):
-    grid = VGroup()
+    """
+    Cell outlines for a rows x cols pixel grid, cell (i, j) centred at
+    [i * pixel, j * pixel]. Every edge is drawn once: all vertical lines
+    are one VMobject and all horizontal lines another, instead of one
+    stroked Square per cell.
+    """
     pixel = 0.2
-    for i in range(rows):
-        for j in range(cols):
-            grid.add(
-                Square(pixel)
-                .set_stroke(color=WHITE, opacity=1, width=0.5)
-                .move_to([i * pixel, j * pixel, 0.0])
-            )
-    return grid  # Add this line to return the grid
+    left, bottom = -pixel / 2, -pixel / 2
+    right, top = left + rows * pixel, bottom + cols * pixel
+
+    xs = left + pixel * np.arange(rows + 1)
+    ys = bottom + pixel * np.arange(cols + 1)
+    zeros_x, zeros_y = np.zeros_like(xs), np.zeros_like(ys)
+
+    vertical = _segments(
+        np.column_stack([xs, np.full_like(xs, bottom), zeros_x]),
+        np.column_stack([xs, np.full_like(xs, top), zeros_x]),
+    )
+    horizontal = _segments(
+        np.column_stack([np.full_like(ys, left), ys, zeros_y]),
+        np.column_stack([np.full_like(ys, right), ys, zeros_y]),
+    )
+
+    grid = VGroup(vertical, horizontal)
+    grid.set_stroke(color=WHITE, opacity=1, width=0.5)
+    return grid
+
+
+class PixelGrid(Group):
+    """
+    Raster framebuffer drawn as one nearest-neighbour image.
+
+    Pixel (i, j) sits exactly in cell (i, j) of Grid(), so the two can be
+    layered: PixelGrid for the fills, Grid on top for the lines.
+    Colours live in an (rows, cols, 4) uint8 array that is a view onto the
+    image, so writing to it is all it takes to change the next frame.
+
+    Alongside it, `index` holds each pixel's palette index as a uint16
+    plane. That is the source of truth for fill decisions: comparing
+    colours is comparing ints, and the image is just its rendering.
+    """
+
+    def __init__(self, rows, cols, pixel=0.2, background=BLACK, background_opacity=0):
+        self.rows = rows
+        self.cols = cols
+        self.pixel = pixel
+
+        # Image rows run top-down along j, image columns along i
+        image = np.zeros((cols, rows, 4), dtype=np.uint8)
+        image[...] = color_to_int_rgba(background, background_opacity)
+
+        self.image = ImageMobject(image)
+        self.image.set_resampling_algorithm(RESAMPLING_ALGORITHMS["nearest"])
+        self.image.stretch_to_fit_width(rows * pixel)
+        self.image.stretch_to_fit_height(cols * pixel)
+        self.image.move_to([(rows - 1) * pixel / 2, (cols - 1) * pixel / 2, 0.0])
+
+        # Index 0 is the background, so a fresh index plane matches the image
+        self.palette = []
+        self._palette_ids = {}
+        self._palette_rgba = np.empty((0, 4), dtype=np.uint8)
+        self.color_index(background, background_opacity)
+        self.index = np.zeros((rows, cols), dtype=np.uint16)
+
+        super().__init__(self.image)
+
+    @property
+    def pixels(self):
+        """(rows, cols, 4) RGBA view indexed [i, j], like Grid()."""
+        return self.image.pixel_array[::-1].transpose(1, 0, 2)
+
+    def color_index(self, color, opacity=1):
+        """Palette index of (color, opacity), adding it on first use."""
+        rgba = np.asarray(color_to_int_rgba(color, opacity), dtype=np.uint8)
+        key = rgba.tobytes()
+        if key not in self._palette_ids:
+            self._palette_ids[key] = len(self.palette)
+            self.palette.append(rgba)
+        return self._palette_ids[key]
+
+    def palette_array(self):
+        """The palette as an (n, 4) uint8 array, rebuilt only after colours are added."""
+        if len(self._palette_rgba) != len(self.palette):
+            self._palette_rgba = np.stack(self.palette)
+        return self._palette_rgba
+
+    @phase("set_pixels")
+    def set_pixels(self, ii, jj, color=WHITE, opacity=1):
+        """Colour every (ii[k], jj[k]) in one array write."""
+        ii, jj = _check_bounds(ii, jj, self.rows, self.cols)
+        idx = self.color_index(color, opacity)
+        self.index[ii, jj] = idx
+        self.pixels[ii, jj] = self.palette[idx]
+        return self
+
+    @phase("set_pixel")
+    def set_pixel(self, i, j, color=WHITE, opacity=1):
+        _check_bounds(i, j, self.rows, self.cols)
+        idx = self.color_index(color, opacity)
+        self.index[i, j] = idx
+        self.pixels[i, j] = self.palette[idx]
+        return self
+
+    @phase("set_coverage")
+    def set_coverage(self, ii, jj, coverage, color=WHITE):
+        """
+        Colour every (ii[k], jj[k]) with `color` at opacity coverage[k],
+        quantized to 1/255, as anti-aliased rasterizers produce. A pixel
+        listed more than once keeps its highest coverage; writes that
+        quantize to 0 are skipped, so they leave the pixel as it was.
+        """
+        ii, jj = _check_bounds(ii, jj, self.rows, self.cols)
+        levels = np.rint(np.clip(coverage, 0, 1) * 255).astype(np.int64)
+        visible = levels > 0
+        ii, jj, levels = ii[visible], jj[visible], levels[visible]
+
+        # Keep the brightest write per pixel: sort by level, take the last
+        order = np.argsort(levels, kind="stable")[::-1]
+        _, first = np.unique(ii[order] * self.cols + jj[order], return_index=True)
+        keep = order[first]
+        ii, jj, levels = ii[keep], jj[keep], levels[keep]
+
+        lookup = np.zeros(256, dtype=np.uint16)
+        for level in np.unique(levels):
+            lookup[level] = self.color_index(color, level / 255)
+        idx = lookup[levels]
+        self.index[ii, jj] = idx
+        self.pixels[ii, jj] = self.palette_array()[idx]
+        return self
+
+    def get_index(self, i, j):
+        """Palette index of pixel (i, j), or None when off the grid."""
+        if 0 <= i < self.rows and 0 <= j < self.cols:
+            return int(self.index[i, j])
+        return None
+
+    def get_pixel_hex(self, i, j):
+        """Uppercase '#RRGGBB' of pixel (i, j), or None when off the grid."""
+        if 0 <= i < self.rows and 0 <= j < self.cols:
+            r, g, b, _ = self.pixels[i, j]
+            return f"#{r:02X}{g:02X}{b:02X}"
+        return None
+
+    def pixel_center(self, i, j):
+        """Scene-space centre of pixel (i, j)."""
+        return self.image.get_corner(DL) + self.pixel * np.array([i + 0.5, j + 0.5, 0.0])
+
+
+class ViewportGrid(Group):
+    """
+    Logically huge raster (say 4096x4096) seen through a small window.
+
+    Only the index plane is canvas-sized. What is on screen is a PixelGrid
+    window of view_rows x view_cols pixels at full detail, laid out exactly
+    like a PixelGrid of that size (so Grid(view_rows, view_cols) still fits
+    over it), plus a downsampled overview of the whole canvas in the top
+    right corner with a frame marking the window.
+
+    follow(i, j) pans the window when the pixel gets within `margin` of
+    its edge, so the view tracks the algorithm like a following camera;
+    with auto_follow every write follows the pixel it writes (the last
+    one, for set_pixels). Each overview pixel shows the last colour
+    written into its block.
+    """
+
+    def __init__(self, rows, cols, view_rows=70, view_cols=40, pixel=0.2,
+                 overview=128, overview_width=2.5, margin=4, auto_follow=True,
+                 background=BLACK, background_opacity=0):
+        self.rows = rows
+        self.cols = cols
+        self.margin = margin
+        self.auto_follow = auto_follow
+        self.origin = (0, 0)   # canvas pixel shown in window pixel (0, 0)
+
+        self.view = PixelGrid(min(view_rows, rows), min(view_cols, cols), pixel, background, background_opacity)
+        self.index = np.zeros((rows, cols), dtype=np.uint16)
+
+        self.factor = -(-max(rows, cols) // overview)   # canvas pixels per overview pixel
+        self.overview = PixelGrid(
+            -(-rows // self.factor), -(-cols // self.factor),
+            overview_width / -(-max(rows, cols) // self.factor), BLACK, 1,
+        )
+        self.overview.to_corner(UR, buff=0.2)
+        self.frame = Rectangle(
+            width=self.view.rows / self.factor * self.overview.pixel,
+            height=self.view.cols / self.factor * self.overview.pixel,
+        ).set_stroke(YELLOW, width=1)
+        self._place_frame()
+
+        super().__init__(self.view, self.overview, self.frame)
+
+    @property
+    def pixel(self):
+        return self.view.pixel
+
+    def color_index(self, color, opacity=1):
+        return self.view.color_index(color, opacity)
+
+    def set_pixels(self, ii, jj, color=WHITE, opacity=1):
+        ii, jj = _check_bounds(ii, jj, self.rows, self.cols)
+        if self.auto_follow and ii.size:
+            self.follow(int(ii[-1]), int(jj[-1]))
+
+        self.index[ii, jj] = self.color_index(color, opacity)
+        self.overview.set_pixels(ii // self.factor, jj // self.factor, color, opacity)
+
+        # Only pixels inside the window touch the image
+        vi, vj = ii - self.origin[0], jj - self.origin[1]
+        inside = (0 <= vi) & (vi < self.view.rows) & (0 <= vj) & (vj < self.view.cols)
+        if inside.any():
+            self.view.set_pixels(vi[inside], vj[inside], color, opacity)
+        return self
+
+    def set_pixel(self, i, j, color=WHITE, opacity=1):
+        return self.set_pixels([i], [j], color, opacity)
+
+    def get_index(self, i, j):
+        """Palette index of canvas pixel (i, j), or None when off the canvas."""
+        if 0 <= i < self.rows and 0 <= j < self.cols:
+            return int(self.index[i, j])
+        return None
+
+    def pixel_center(self, i, j):
+        """Scene-space centre of canvas pixel (i, j) in the current window."""
+        return self.view.pixel_center(i - self.origin[0], j - self.origin[1])
+
+    def follow(self, i, j):
+        """Pan the window so (i, j) is at least `margin` from its edge. True if it moved."""
+        x0, y0 = self.origin
+        w, h = self.view.rows, self.view.cols
+        m = min(self.margin, w // 2, h // 2)
+        if x0 + m <= i < x0 + w - m and y0 + m <= j < y0 + h - m:
+            return False
+
+        self.pan_to(int(np.clip(i - w // 2, 0, self.rows - w)), int(np.clip(j - h // 2, 0, self.cols - h)))
+        return True
+
+    def pan_to(self, x0, y0):
+        """Show the window starting at canvas pixel (x0, y0), recoloured from the index plane."""
+        self.origin = (x0, y0)
+        window = self.index[x0:x0 + self.view.rows, y0:y0 + self.view.cols]
+        self.view.index[...] = window
+        self.view.pixels[...] = self.view.palette_array()[window]
+        self._place_frame()
+        return self
+
+    def _place_frame(self):
+        x0, y0 = self.origin
+        corner = self.overview.image.get_corner(DL)
+        center = np.array([
+            (x0 + self.view.rows / 2) / self.factor,
+            (y0 + self.view.cols / 2) / self.factor,
+            0.0,
+        ])
+        self.frame.move_to(corner + self.overview.pixel * center)
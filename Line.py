@@ -1,103 +1,119 @@
 from manim import *
-from Grid import Grid
+from Grid import Grid, PixelGrid
+from Tracelib import BRESENHAM_CODE, WU_CODE, iter_bresenham, iter_wu
+from Rasterlib import clip_bresenham, wu_batch
+from Textcache import cached_text
+from Codepanel import CodePanel
+from Backdrop import bake
+from Pacing import Pacing
 
 rows, cols = 70, 20
 
-def set_pixel(grid, i, j, cols, color=BLUE, opacity=1):
-    index = i * cols + j
-    grid[index].set_fill(color=color, opacity=opacity)
-
-def bresenham(grid, scene, code_lines, x0, y0, x1, y1):
-    dx = x1 - x0
-    dy = y1 - y0
-    x = x0
-    y = y0
-    P = 2*dy - dx
-    
-    # Create large P value display at bottom center
-    p_display = Text(f"P = {P}", font="Monospace", font_size=36, color=GREEN, weight=BOLD)
-    p_display.to_edge(DOWN, buff=0.8)
-    scene.add(p_display)
-    
-    # Create small x and y display above P
-    xy_display = Text(f"x = {x}    y = {y}", font="Monospace", font_size=18, color=WHITE)
-    xy_display.next_to(p_display, UP, buff=0.3)
-    scene.add(xy_display)
-    
-    while x != x1:
-        # Draw pixel
-        scene.highlight_code_line(code_lines, 8)
-        set_pixel(grid, x, y, cols)
-        
-        # Update displays
-        p_display.become(Text(f"P = {P}", font="Monospace", font_size=36, color=GREEN, weight=BOLD))
-        p_display.to_edge(DOWN, buff=0.8)
-        xy_display.become(Text(f"x = {x}    y = {y}", font="Monospace", font_size=18, color=WHITE))
-        xy_display.next_to(p_display, UP, buff=0.3)
-        scene.wait(0.5)
-        
-        # Check condition (no text display, just highlight)
-        scene.highlight_code_line(code_lines, 9)
-        scene.wait(0.6)
-        
-        if P < 0:
-            scene.highlight_code_line(code_lines, 10)
-            P += 2*dy
-            scene.wait(0.5)
-        else:
-            scene.highlight_code_line(code_lines, 12)
-            y += 1
-            scene.wait(0.4)
-            
-            scene.highlight_code_line(code_lines, 13)
-            P += 2*dy - 2*dx
-            scene.wait(0.5)
-        
-        scene.highlight_code_line(code_lines, 14)
-        x += 1
-        scene.wait(0.5)
-    
+def set_pixel(grid, i, j, color=BLUE, opacity=1):
+    grid.set_pixel(i, j, color=color, opacity=opacity)
+
+def bresenham(grid, scene, code, x0, y0, x1, y1, pace=None):
+    """
+    Animate Tracelib.iter_bresenham, clipped to the grid: each step
+    highlights its line and lights its pixel, with P, x and y shown below.
+    """
+    # Only the steps whose pixel is on the grid are animated
+    pace = pace or Pacing(scene, total=len(clip_bresenham(x0, y0, x1, y1, grid.rows, grid.cols)))
+    p_display = xy_display = None
+
+    for step in iter_bresenham(x0, y0, x1, y1, size=(grid.rows, grid.cols)):
+        if step.line == 8:
+            pace.tick()
+        code.highlight(step.line)
+        for i, j, color in step.pixels:
+            set_pixel(grid, i, j, color=color)
+
+        if step.line == 8:
+            v = step.values
+            p_text = cached_text(f"P = {v['P']}", font="Monospace", font_size=36, color=GREEN, weight=BOLD)
+            xy_text = cached_text(f"x = {v['x']}    y = {v['y']}", font="Monospace", font_size=18, color=WHITE)
+            if p_display is None:
+                # Large P value at bottom center, x and y above it
+                p_display, xy_display = p_text, xy_text
+                scene.add(p_display, xy_display)
+            else:
+                p_display.become(p_text)
+                xy_display.become(xy_text)
+            p_display.to_edge(DOWN, buff=0.8)
+            xy_display.next_to(p_display, UP, buff=0.3)
+        pace.wait(step.wait)
+
+    pace.flush()
+    scene.wait(1)
+
+def wu_line(grid, scene, code, x0, y0, x1, y1, pace=None):
+    """
+    Animate Tracelib.iter_wu. Steep lines are walked with x and y swapped
+    and right-to-left ones from the other end; every pixel is written with
+    its coverage, and intery and the major-axis x are shown below.
+    """
+    pace = pace or Pacing(scene, total=max(abs(x1 - x0), abs(y1 - y0)))
+    intery_display = x_display = None
+    state = {}
+
+    for step in iter_wu(x0, y0, x1, y1):
+        if step.line == 9:
+            pace.tick()
+        code.highlight(step.line)
+        # Through set_coverage, so a write that rounds to 0 leaves the pixel alone
+        for i, j, color, coverage in step.pixels:
+            grid.set_coverage(np.array([i]), np.array([j]), [coverage], color=color)
+
+        state.update(step.values)
+        if step.line in (7, 9):
+            # Shown from the first endpoint on, then at the top of every column
+            x = state["x"] if step.line == 9 else state["xs"] + 1
+            intery_text = cached_text(f"intery = {state['intery']:.2f}", font="Monospace", font_size=36, color=GREEN, weight=BOLD)
+            x_text = cached_text(f"x = {x}", font="Monospace", font_size=18, color=WHITE)
+            if intery_display is None:
+                intery_display, x_display = intery_text, x_text
+                scene.add(intery_display, x_display)
+            else:
+                intery_display.become(intery_text)
+                x_display.become(x_text)
+            intery_display.to_edge(DOWN, buff=0.8)
+            x_display.next_to(intery_display, UP, buff=0.3)
+        pace.wait(step.wait)
+
+    pace.flush()
     scene.wait(1)
 
 class GridLine(Scene):
-    def highlight_code_line(self, code_lines, line_number):
-        for i, line in enumerate(code_lines, start=1):
-            line.set_color(YELLOW if i == line_number else WHITE)
-            line.set_opacity(1 if i == line_number else 0.5)
-    
     def construct(self):
         grid = Grid(rows, cols)
+        pixels = PixelGrid(rows, cols)
         
-        code = VGroup()
-        lines = [
-            "void bresenham(int x0, int y0, int x1, int y1) {",
-            "   int dx = x1 - x0;",
-            "   int dy = y1 - y0;",
-            "   int x = x0;",
-            "   int y = y0;",
-            "   int P = 2*dy - dx;",
-            "   while (x != x1) {",
-            "      putpixel(x, y);",
-            "      if (P < 0)",
-            "         P += 2*dy;",
-            "      else",
-            "         y++;",
-            "         P += 2*dy - 2*dx;",
-            "      x++;",
-            "   }",
-            "}",
-        ]
-        
-        for line in lines:
-            text = Text("●" + line, font="Monospace", font_size=9, color=WHITE)
-            text[0].set_opacity(0)
-            code.add(text)
-        
-        code.arrange(DOWN, aligned_edge=LEFT, buff=0.2)
-        code.to_edge(LEFT).to_edge(UP, buff=0.5)
+        code = CodePanel(BRESENHAM_CODE)
         
-        self.add(grid, code)
+        self.add(pixels, grid, code)
+        bake(self, grid, code)
         self.wait(2)
         
-        bresenham(grid, self, code, 1, 1, 40, 20)
+        bresenham(pixels, self, code, 1, 1, 40, 20)
+        self.wait(5)
+
+class GridWuLine(Scene):
+    def construct(self):
+        grid = Grid(rows, cols)
+        pixels = PixelGrid(rows, cols)
+
+        code = CodePanel(WU_CODE)
+
+        self.add(pixels, grid, code)
+        bake(self, grid, code)
+        self.wait(2)
+
+        wu_line(pixels, self, code, 1, 1, 40, 17)
+
+        # The same algorithm for a whole fan of lines in one vectorized pass
+        angles = np.linspace(0, PI / 2, 12)
+        x1 = 45 + np.round(18 * np.cos(angles)).astype(int)
+        y1 = 1 + np.round(18 * np.sin(angles)).astype(int)
+        _, xs, ys, coverage = wu_batch(np.full_like(x1, 45), np.ones_like(y1), x1, y1)
+        pixels.set_coverage(xs, ys, coverage, color=YELLOW)
         self.wait(5)
@@ -0,0 +1,109 @@
+from contextlib import contextmanager
+
+from manim import *
+
+class Pacing:
+    """
+    Time budget shared by the algorithm scenes.
+
+    Scenes call tick() at the top of every loop iteration and pace.wait(t)
+    where they used to call scene.wait(t). The first `detail` iterations
+    play exactly as written. After that each wait is scaled so the rest of
+    the loop fits in what is left of `budget` seconds (or `frames` frames).
+    Scaled waits are pooled until they add up to `min_frames` frames, so
+    several cheap iterations end up sharing one batch of frames.
+
+    `total` is the number of iterations if the scene knows it up front.
+    Without it, every later iteration gets `share` of the remaining budget,
+    which still keeps arbitrarily long inputs inside the budget.
+    """
+
+    def __init__(self, scene, budget=30.0, frames=None, detail=3, total=None,
+                 share=0.05, min_frames=2):
+        self.scene = scene
+        self.frame = 1 / config.frame_rate
+        self.budget = frames * self.frame if frames is not None else budget
+        self.detail = detail
+        self.total = total
+        self.share = share
+        self.min_frames = min_frames
+
+        self.iteration = 0
+        self.spent = 0.0          # seconds of video played through this controller
+        self.pending = 0.0        # scaled wait time not yet played
+        self.scale = 1.0
+        self._detail_time = 0.0   # unscaled wait time of the detailed iterations
+        self._muted = False
+
+    @property
+    def detailed(self):
+        """True while iterations still play at full length."""
+        return self.iteration <= self.detail
+
+    def tick(self):
+        """Start the next iteration and rescale waits for it."""
+        self.iteration += 1
+        if self.detailed:
+            return
+
+        left = max(self.budget - self.spent - self.pending, 0.0)
+        if self.total is not None:
+            allowance = left / max(self.total - self.iteration + 1, 1)
+        else:
+            allowance = left * self.share
+
+        natural = self._detail_time / max(min(self.iteration - 1, self.detail), 1)
+        self.scale = min(1.0, allowance / natural) if natural > 0 else 0.0
+
+    def wait(self, duration):
+        if self.detailed:
+            self._detail_time += duration
+            self._play_wait(duration)
+            return
+
+        self.pending += duration * self.scale
+        if self.pending >= self.min_frames * self.frame:
+            self.flush()
+
+    def run_time(self, duration):
+        """
+        Scaled run_time for an animation. Returns 0 when the scaled time is
+        under a frame; the caller should then jump to the end state, and the
+        time is pooled like a wait.
+        """
+        if self.detailed:
+            self._detail_time += duration
+            self.spent += duration
+            return duration
+
+        scaled = duration * self.scale
+        if scaled < self.frame:
+            self.pending += scaled
+            return 0
+        self.spent += scaled
+        return scaled
+
+    def flush(self):
+        """Play whatever pooled wait time has built up."""
+        if self.pending >= self.frame:
+            self._play_wait(self.pending)
+        self.pending = 0.0
+
+    @contextmanager
+    def muted(self):
+        """
+        Run iterations through the budget without playing their waits, so a
+        scene rendered in parts can catch up with the iterations an earlier
+        part showed and pace the rest exactly as one render would.
+        """
+        self._muted = True
+        try:
+            yield self
+            self.flush()
+        finally:
+            self._muted = False
+
+    def _play_wait(self, duration):
+        if not self._muted:
+            self.scene.wait(duration)
+        self.spent += duration
@@ -0,0 +1,97 @@
+import os
+from contextlib import nullcontext
+from itertools import islice
+
+from manim import *
+from Grid import Grid, PixelGrid
+from Tracelib import bresenham_trace, load_trace
+from Textcache import cached_text
+from Codepanel import CodePanel
+from Backdrop import bake
+
+def format_values(values):
+    parts = []
+    for name, value in values.items():
+        if isinstance(value, float):
+            parts.append(f"{name} = {value:.2f}")
+        elif isinstance(value, (list, tuple)):
+            parts.append(f"{name} ({value[0]},{value[1]})")
+        else:
+            parts.append(f"{name} = {value}")
+    return "    ".join(parts)
+
+def _apply(step, grid, code, display, stack):
+    if code is not None:
+        code.highlight(step.line)
+
+    for x, y, color, *coverage in step.pixels:
+        if coverage:
+            # Anti-aliased writes that round to 0 must not erase the pixel
+            grid.set_coverage(np.array([x]), np.array([y]), coverage, color=color)
+        else:
+            grid.set_pixel(x, y, color=color)
+
+    if stack is not None:
+        if "pop" in step.values:
+            stack.pop_element()
+        if "push" in step.values:
+            x, y = step.values["push"]
+            stack.add_element(f"({x},{y})")
+
+    if display is not None and step.values:
+        display.become(cached_text(format_values(step.values), font="Monospace", font_size=18, color=WHITE))
+        display.to_edge(DOWN, buff=0.8)
+
+def play_steps(scene, steps, grid, code=None, display=None, stack=None, skip=0, limit=None):
+    """
+    Animate Tracelib steps as they are pulled from `steps`, which can be a
+    Trace's list or a lazy iter_* stepper.
+
+    Each step highlights its line in code (a CodePanel), writes its pixels to grid (a
+    PixelGrid), shows its values in display, mirrors push/pop on stack (a
+    ManimStack) and waits as long as the original scene did. The first
+    `skip` steps are fast-forwarded: applied with no waits, the stack settled
+    in one instant batch, so playback starts mid-run on the right frame.
+    Playback stops after `limit` animated steps, leaving the rest unpulled.
+    """
+    steps = iter(steps)
+    with stack.batch(run_time=0) if stack is not None and skip else nullcontext():
+        for step in islice(steps, skip):
+            _apply(step, grid, code, display, stack)
+
+    for step in islice(steps, limit):
+        _apply(step, grid, code, display, stack)
+        if step.wait:
+            scene.wait(step.wait)
+
+def play_trace(scene, trace, grid, code=None, display=None, stack=None):
+    """Animate a Tracelib.Trace; see play_steps."""
+    play_steps(scene, trace.steps, grid, code, display, stack)
+
+
+class TracePlayback(Scene):
+    """
+    Replays the trace saved at $RASTER_TRACE, or a fresh Bresenham line,
+    fast-forwarding through the first $RASTER_TRACE_SKIP steps.
+    """
+
+    def construct(self):
+        path = os.environ.get("RASTER_TRACE")
+        trace = load_trace(path) if path else bresenham_trace(1, 1, 40, 20)
+
+        pixels = [p for step in trace.steps for p in step.pixels]
+        rows = max([p[0] for p in pixels], default=0) + 2
+        cols = max([p[1] for p in pixels], default=0) + 2
+
+        grid = Grid(rows, cols)
+        framebuffer = PixelGrid(rows, cols)
+        code = CodePanel(trace.code)
+        display = cached_text(trace.algorithm, font="Monospace", font_size=18)
+
+        self.add(framebuffer, grid, code, display)
+        bake(self, grid, code)
+        self.wait(1)
+
+        skip = int(os.environ.get("RASTER_TRACE_SKIP", 0))
+        play_steps(self, trace.steps, framebuffer, code=code, display=display, skip=skip)
+        self.wait(3)
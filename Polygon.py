@@ -0,0 +1,103 @@
+from manim import *
+from Grid import Grid, PixelGrid
+from Tracelib import POLYGON_FILL_CODE
+from Rasterlib import edge_table
+from Textcache import cached_text
+from Codepanel import CodePanel
+from Backdrop import bake
+from Pacing import Pacing
+
+rows, cols = 70, 20
+
+def aet_panel(active):
+    """The active edge table, one row per edge, in its current order."""
+    lines = [f"{'ymax':>4} {'x':>7} {'1/m':>6}"]
+    for ymax, x, inverse in active:
+        lines.append(f"{ymax:>4} {float(x):>7.2f} {float(inverse):>6.2f}")
+    texts = [cached_text(line, font="Monospace", font_size=14, color=WHITE) for line in lines]
+    texts[0].set_color(YELLOW)
+    panel = VGroup(*texts).arrange(DOWN, aligned_edge=LEFT, buff=0.15)
+    return panel.to_corner(DL, buff=0.5)
+
+def scanline_polygon(grid, scene, code, vertices, color=BLUE, pace=None):
+    """
+    Fill a polygon one scanline at a time from its edge table.
+
+    Same loop as Rasterlib.polygon_fill_reference: edges enter the AET on
+    their ymin scanline and leave on their ymax, each pair of sorted
+    crossings is filled as one span, and every edge's x moves by 1/m.
+    """
+    code.highlight(2)
+    table = edge_table(vertices)
+    if not table:
+        return
+    y = min(table)
+    pace = pace or Pacing(scene, total=max(e[0] for edges in table.values() for e in edges) - y)
+    scene.wait(0.5)
+
+    code.highlight(3)
+    active = []
+    panel = aet_panel(active)
+    scanline = Line(grid.pixel_center(-0.5, y), grid.pixel_center(rows - 0.5, y), color=YELLOW, stroke_width=2)
+    scene.add(panel, scanline)
+    scene.wait(0.5)
+
+    while table or active:
+        pace.tick()
+        code.highlight(4)
+        scanline.put_start_and_end_on(grid.pixel_center(-0.5, y), grid.pixel_center(rows - 0.5, y))
+        pace.wait(0.3)
+
+        entering = table.pop(y, [])
+        if entering:
+            code.highlight(5)
+            active.extend(entering)
+            panel.become(aet_panel(active))
+            pace.wait(0.5)
+
+        if any(edge[0] <= y for edge in active):
+            code.highlight(6)
+            active = [edge for edge in active if edge[0] > y]
+            panel.become(aet_panel(active))
+            pace.wait(0.5)
+
+        code.highlight(7)
+        active.sort(key=lambda edge: edge[1])
+        panel.become(aet_panel(active))
+        pace.wait(0.4)
+
+        # One write per span, however wide
+        code.highlight(9)
+        for left, right in zip(active[0::2], active[1::2]):
+            span = np.arange(int(np.ceil(left[1])), int(np.ceil(right[1])))
+            grid.set_pixels(span, np.full(span.size, y), color=color)
+        pace.wait(0.5)
+
+        code.highlight(11)
+        for edge in active:
+            edge[1] += edge[2]
+        panel.become(aet_panel(active))
+        pace.wait(0.3)
+        y += 1
+
+    scene.remove(scanline)
+    pace.flush()
+    scene.wait(1)
+
+class GridPolygon(Scene):
+    def construct(self):
+        grid = Grid(rows, cols)
+        pixels = PixelGrid(rows, cols)
+
+        code = CodePanel(POLYGON_FILL_CODE)
+
+        # Concave, so some scanlines cross four edges; pixel centres are lattice points
+        vertices = [(4, 1), (30, 3), (22, 10), (32, 18), (12, 16), (8, 8)]
+        outline = Polygon(*[pixels.pixel_center(x, y) for x, y in vertices], color=WHITE, stroke_width=2)
+
+        self.add(pixels, grid, code, outline)
+        bake(self, grid, code, outline)
+        self.wait(2)
+
+        scanline_polygon(pixels, self, code, vertices)
+        self.wait(5)
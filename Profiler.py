@@ -0,0 +1,102 @@
+"""
+Opt-in render profiling.
+
+Set RASTER_PROFILE to an output file and render as usual:
+
+    RASTER_PROFILE=ellipse.trace.json manim -ql Ellipse.py GridEllipse
+
+Every helper decorated with @phase(...) then records its wall time and call
+count, and so do Scene.render, Scene.play and Scene.wait (the last two are
+where frames are rendered and encoded). At exit a summary table goes to
+stderr and a Chrome trace, viewable in chrome://tracing or Perfetto, is
+written to the file. With the variable unset, phase() returns functions
+untouched, so the hooks cost nothing.
+"""
+import atexit
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from collections import defaultdict
+
+TRACE_PATH = os.environ.get("RASTER_PROFILE")
+ENABLED = bool(TRACE_PATH)
+
+_origin = time.perf_counter()
+_events = []                                   # Chrome trace "complete" events
+_stats = defaultdict(lambda: [0, 0.0, 0.0])    # name -> [calls, total s, self s]
+_stack = []                                    # open phases: [name, start, time in children]
+
+
+class _Phase:
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        if ENABLED:
+            _stack.append([self.name, time.perf_counter(), 0.0])
+        return self
+
+    def __exit__(self, *exc):
+        if not ENABLED:
+            return False
+        name, start, children = _stack.pop()
+        elapsed = time.perf_counter() - start
+        stats = _stats[name]
+        stats[0] += 1
+        stats[1] += elapsed
+        stats[2] += elapsed - children
+        if _stack:
+            _stack[-1][2] += elapsed
+        _events.append({
+            "name": name, "ph": "X",
+            "ts": (start - _origin) * 1e6, "dur": elapsed * 1e6,
+            "pid": os.getpid(), "tid": threading.get_ident(),
+        })
+        return False
+
+    def __call__(self, fn):
+        if not ENABLED:
+            return fn
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with self:
+                return fn(*args, **kwargs)
+        return wrapper
+
+
+def phase(name):
+    """Time a block (`with phase("x"):`) or every call of a function (`@phase("x")`)."""
+    return _Phase(name)
+
+
+def summary(file=sys.stderr):
+    """Per-phase calls, total and self time, slowest self time first."""
+    wall = time.perf_counter() - _origin
+    print(f"{'phase':<22}{'calls':>9}{'total ms':>12}{'self ms':>12}{'mean ms':>10}{'self %':>8}", file=file)
+    for name, (calls, total, own) in sorted(_stats.items(), key=lambda item: -item[1][2]):
+        print(f"{name:<22}{calls:>9}{total * 1e3:>12.1f}{own * 1e3:>12.1f}"
+              f"{total / calls * 1e3:>10.3f}{own / wall * 100:>7.1f}%", file=file)
+
+
+def write_trace(path):
+    with open(path, "w") as f:
+        json.dump({"traceEvents": _events, "displayTimeUnit": "ms"}, f)
+
+
+def _report():
+    summary()
+    write_trace(TRACE_PATH)
+    print(f"Profile written to {TRACE_PATH}", file=sys.stderr)
+
+
+if ENABLED:
+    from manim import Scene
+
+    Scene.render = phase("render")(Scene.render)
+    Scene.play = phase("play")(Scene.play)
+    Scene.wait = phase("wait")(Scene.wait)
+    atexit.register(_report)
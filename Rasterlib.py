@@ -0,0 +1,1095 @@
+"""
+Headless rasterizers — no manim needed.
+
+The *_reference functions are the loops animated by dda_manim.py, Line.py,
+Circle.py, Ellipse.py, Boundary.py and Polygon.py with the drawing stripped out. The other functions
+return the same pixels, in the same order, as NumPy arrays computed in closed
+form instead of one Python iteration per pixel.
+
+The curve formulas are only trusted after they pass the algorithm's own
+recurrence: every step is re-checked against the decision parameter in one
+vectorized pass, and the reference loop is used if any step disagrees.
+
+wu_batch is the odd one out: Xiaolin Wu's anti-aliased line has no scene
+loop to mirror, so wu_reference is its loop, and its output carries a
+coverage per pixel.
+
+The clip_* functions are the scenes' pre-pass against the grid rectangle:
+they say which steps of a primitive put pixels on the grid, so the scenes
+only animate those.
+
+    python Rasterlib.py      # verify closed forms against the loops
+"""
+import math
+from bisect import bisect_left
+from collections import defaultdict, namedtuple
+from fractions import Fraction
+from itertools import chain
+
+import numpy as np
+
+
+# ----------------------------------------------------------------------
+# Reference loops (same arithmetic as the scenes)
+# ----------------------------------------------------------------------
+def dda_reference(x0, y0, x1, y1):
+    dx = x1 - x0
+    dy = y1 - y0
+    steps = max(abs(dx), abs(dy))
+
+    x_inc = dx / steps
+    y_inc = dy / steps
+
+    x = float(x0)
+    y = float(y0)
+
+    pixels = []
+    for i in range(steps + 1):
+        pixels.append((round(x), round(y)))
+        x += x_inc
+        y += y_inc
+    return pixels
+
+
+def bresenham_reference(x0, y0, x1, y1):
+    dx = x1 - x0
+    dy = y1 - y0
+    x = x0
+    y = y0
+    P = 2*dy - dx
+
+    pixels = []
+    while x != x1:
+        pixels.append((x, y))
+        if P < 0:
+            P += 2*dy
+        else:
+            y += 1
+            P += 2*dy - 2*dx
+        x += 1
+    return pixels
+
+
+def circle_reference(xc, yc, r):
+    x = 0
+    y = r
+    d = 1 - r
+
+    pixels = []
+    while x <= y:
+        pixels.extend([
+            (xc + x, yc + y), (xc - x, yc + y), (xc + x, yc - y), (xc - x, yc - y),
+            (xc + y, yc + x), (xc - y, yc + x), (xc + y, yc - x), (xc - y, yc - x),
+        ])
+        if d < 0:
+            d += 2 * x + 3
+        else:
+            d += 2 * (x - y) + 5
+            y -= 1
+        x += 1
+    return pixels
+
+
+def ellipse_region1_reference(xc, yc, rx, ry):
+    """Returns (pixels, (x, y, rx2, ry2)) — the handoff region 2 starts from."""
+    x = 0
+    y = ry
+    rx2 = rx * rx
+    ry2 = ry * ry
+    d1 = ry2 - rx2 * ry + 0.25 * rx2
+
+    pixels = []
+    while (2 * ry2 * x) < (2 * rx2 * y):
+        pixels.extend([(xc + x, yc + y), (xc - x, yc + y), (xc + x, yc - y), (xc - x, yc - y)])
+        if d1 < 0:
+            d1 += 2 * ry2 * x + 3 * ry2
+        else:
+            y -= 1
+            d1 += 2 * ry2 * x - 2 * rx2 * y + 3 * ry2 + 2 * rx2
+        x += 1
+    return pixels, (x, y, rx2, ry2)
+
+
+def ellipse_region2_reference(xc, yc, rx, ry, x, y, rx2, ry2):
+    d2 = ry2 * (x + 0.5) * (x + 0.5) + rx2 * (y - 1) * (y - 1) - rx2 * ry2
+
+    pixels = []
+    while y >= 0:
+        pixels.extend([(xc + x, yc + y), (xc - x, yc + y), (xc + x, yc - y), (xc - x, yc - y)])
+        if d2 > 0:
+            y -= 1
+            d2 += -2 * rx2 * y + 3 * rx2
+        else:
+            x += 1
+            y -= 1
+            d2 += 2 * ry2 * x - 2 * rx2 * y + 3 * rx2 + 2 * ry2
+    return pixels
+
+
+def ellipse_reference(xc, yc, rx, ry):
+    pixels, handoff = ellipse_region1_reference(xc, yc, rx, ry)
+    return pixels + ellipse_region2_reference(xc, yc, rx, ry, *handoff)
+
+
+def _fract(v):
+    return v - math.floor(v)
+
+
+def wu_reference(x0, y0, x1, y1):
+    """
+    Xiaolin Wu anti-aliased line as (x, y, coverage) triples: the first
+    endpoint's pixel pair, one pair per column in between, then the last
+    endpoint's pair. Endpoints may be fractional.
+    """
+    x0, y0, x1, y1 = float(x0), float(y0), float(x1), float(y1)
+    steep = abs(y1 - y0) > abs(x1 - x0)
+    if steep:
+        x0, y0, x1, y1 = y0, x0, y1, x1
+    if x0 > x1:
+        x0, y0, x1, y1 = x1, y1, x0, y0
+    dx = x1 - x0
+    gradient = (y1 - y0) / dx if dx != 0 else 1.0
+
+    pixels = []
+
+    def plot(x, y, coverage):
+        pixels.append((y, x, coverage) if steep else (x, y, coverage))
+
+    def endpoint(x, y, gap):
+        xend = math.floor(x + 0.5)
+        yend = y + gradient * (xend - x)
+        base = math.floor(yend)
+        f = yend - base
+        plot(xend, base, (1 - f) * gap)
+        plot(xend, base + 1, f * gap)
+        return xend, yend
+
+    xs, yend = endpoint(x0, y0, 1 - _fract(x0 + 0.5))
+    intery = yend + gradient
+    for x in range(xs + 1, math.floor(x1 + 0.5)):
+        base = math.floor(intery)
+        f = intery - base
+        plot(x, base, 1 - f)
+        plot(x, base + 1, f)
+        intery += gradient
+    endpoint(x1, y1, _fract(x1 + 0.5))
+    return pixels
+
+
+def boundary_fill_reference(canvas, x, y, boundary, fill):
+    """
+    Boundary.boundaryfill over a 2-D array of colour values indexed [x, y].
+    Fills a copy of canvas and returns the pixels in fill order.
+    """
+    canvas = [list(column) for column in canvas]
+    rows, cols = len(canvas), len(canvas[0])
+    if not (0 <= x < rows and 0 <= y < cols):
+        return []
+    start = canvas[x][y]
+    if start == boundary or start == fill:
+        return []
+
+    pixels = []
+    stack = [(x, y)]
+    while stack:
+        cx, cy = stack.pop()
+        if canvas[cx][cy] != start:
+            continue
+        canvas[cx][cy] = fill
+        pixels.append((cx, cy))
+        for nx, ny in ((cx, cy - 1), (cx, cy + 1), (cx - 1, cy), (cx + 1, cy)):
+            if 0 <= nx < rows and 0 <= ny < cols and canvas[nx][ny] == start:
+                stack.append((nx, ny))
+    return pixels
+
+
+def scanline_fill_reference(canvas, x, y, boundary, fill):
+    """Boundary.scanline_fill, same conventions as boundary_fill_reference."""
+    canvas = [list(column) for column in canvas]
+    rows, cols = len(canvas), len(canvas[0])
+    if not (0 <= x < rows and 0 <= y < cols):
+        return []
+    start = canvas[x][y]
+    if start == boundary or start == fill:
+        return []
+
+    def fillable(i, j):
+        return 0 <= i < rows and 0 <= j < cols and canvas[i][j] == start
+
+    pixels = []
+    seeds = [(x, y)]
+    while seeds:
+        sx, sy = seeds.pop()
+        if not fillable(sx, sy):
+            continue
+        left = sx
+        while fillable(left - 1, sy):
+            left -= 1
+        right = sx
+        while fillable(right + 1, sy):
+            right += 1
+        for i in range(left, right + 1):
+            canvas[i][sy] = fill
+            pixels.append((i, sy))
+        for ny in (sy - 1, sy + 1):
+            i = left
+            while i <= right:
+                if not fillable(i, ny):
+                    i += 1
+                    continue
+                seeds.append((i, ny))
+                while i <= right and fillable(i, ny):
+                    i += 1
+    return pixels
+
+
+def edge_table(vertices):
+    """
+    Polygon.scanline_polygon's edge table: {ymin: [[ymax, x, 1/m], ...]}.
+
+    An edge covers scanlines ymin <= y < ymax, so a vertex shared by two
+    edges is crossed once and horizontal edges never. x is the edge's
+    crossing with scanline ymin, kept as an exact Fraction so adding 1/m
+    once per scanline never drifts.
+    """
+    points = [(Fraction(x), Fraction(y)) for x, y in vertices]
+    table = defaultdict(list)
+    for (xa, ya), (xb, yb) in zip(points, points[1:] + points[:1]):
+        if ya > yb:
+            xa, ya, xb, yb = xb, yb, xa, ya
+        ymin, ymax = math.ceil(ya), math.ceil(yb)
+        if ymin < ymax:
+            inverse = (xb - xa) / (yb - ya)
+            table[ymin].append([ymax, xa + (ymin - ya) * inverse, inverse])
+    return table
+
+
+def polygon_fill_reference(vertices):
+    """
+    Scanline polygon fill with an edge table and an active edge table.
+
+    Pixel (x, y) is filled when its centre is inside the polygon (even-odd
+    rule): on scanline y each pair of sorted crossings xl, xr fills
+    ceil(xl) <= x < ceil(xr). Returns the pixels scanline by scanline,
+    left to right.
+    """
+    table = edge_table(vertices)
+    active = []
+    pixels = []
+    y = min(table, default=0)
+    while table or active:
+        active.extend(table.pop(y, []))
+        active = [edge for edge in active if edge[0] > y]
+        active.sort(key=lambda edge: edge[1])
+        for left, right in zip(active[0::2], active[1::2]):
+            for x in range(math.ceil(left[1]), math.ceil(right[1])):
+                pixels.append((x, y))
+        for edge in active:
+            edge[1] += edge[2]
+        y += 1
+    return pixels
+
+
+# ----------------------------------------------------------------------
+# Helpers
+# ----------------------------------------------------------------------
+class RasterBatch(namedtuple("RasterBatch", ["offsets", "xs", "ys"])):
+    """
+    Pixels of N primitives in CSR form: primitive i owns
+    xs[offsets[i]:offsets[i + 1]] and the matching slice of ys.
+    """
+    __slots__ = ()
+
+    def pixels(self, i):
+        start, stop = self.offsets[i], self.offsets[i + 1]
+        return self.xs[start:stop], self.ys[start:stop]
+
+
+class CoverageBatch(namedtuple("CoverageBatch", ["offsets", "xs", "ys", "coverage"])):
+    """RasterBatch with a coverage in [0, 1] for every pixel."""
+    __slots__ = ()
+
+    def pixels(self, i):
+        start, stop = self.offsets[i], self.offsets[i + 1]
+        return self.xs[start:stop], self.ys[start:stop], self.coverage[start:stop]
+
+
+def _isqrt(a):
+    """Elementwise floor(sqrt(a)) for non-negative int64 arrays, exact."""
+    a = np.asarray(a, dtype=np.int64)
+    s = np.sqrt(a.astype(np.float64)).astype(np.int64)
+    while True:
+        over = s * s > a
+        if not over.any():
+            break
+        s[over] -= 1
+    while True:
+        under = (s + 1) * (s + 1) <= a
+        if not under.any():
+            break
+        s[under] += 1
+    return s
+
+
+def _as_arrays(pixels):
+    """List of (x, y) tuples -> (xs, ys) int64 arrays."""
+    if not pixels:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    flat = np.fromiter(chain.from_iterable(pixels), dtype=np.int64, count=2 * len(pixels))
+    return flat[0::2], flat[1::2]
+
+
+def _int_arrays(*values):
+    """Broadcast scalars and sequences to equal-length 1-D int64 arrays."""
+    return [np.ravel(v).astype(np.int64) for v in np.broadcast_arrays(*values)]
+
+
+def _segments(counts):
+    """CSR offsets, plus the owning primitive and local index of every slot."""
+    offsets = np.zeros(len(counts) + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+    owner = np.repeat(np.arange(len(counts)), counts)
+    local = np.arange(offsets[-1], dtype=np.int64) - offsets[owner]
+    return offsets, owner, local
+
+
+def _running_sum(start, step, counts):
+    """
+    start, start + step, start + step + step, ... for counts[i] terms of
+    primitive i, in CSR order. Each value is summed one step at a time in
+    the loop's own order, so it is bit-for-bit the float the loop holds.
+    The walk goes by local index over the primitives still running
+    (longest first), so no primitive is padded to the longest one.
+    """
+    offsets, _, _ = _segments(counts)
+    out = np.empty(offsets[-1])
+    order = np.argsort(-counts, kind="stable")
+    lengths = -counts[order]                    # ascending, for searchsorted
+    value = np.asarray(start, dtype=np.float64)[order]
+    step = np.asarray(step, dtype=np.float64)[order]
+    dest = offsets[:-1][order]
+    for k in range(-int(lengths[0]) if len(lengths) else 0):
+        running = np.searchsorted(lengths, -k)   # primitives with more than k terms
+        if k:
+            value[:running] += step[:running]
+        out[dest[:running] + k] = value[:running]
+    return out
+
+
+def _segment_max_scan(values, owner):
+    """np.maximum.accumulate restarted at every primitive boundary."""
+    if values.size == 0:
+        return values
+    # Lift each primitive above everything before it so nothing leaks across
+    lo = values.min()
+    lift = owner * (values.max() - lo + 1)
+    return np.maximum.accumulate(values - lo + lift) - lift + lo
+
+
+def _first_true(cond, owner, local, n, default):
+    """Local index of each primitive's first True slot, or default."""
+    first = np.full(n, default, dtype=np.int64)
+    hit = np.flatnonzero(cond)
+    lead = np.ones(hit.size, dtype=bool)
+    lead[1:] = owner[hit[1:]] != owner[hit[:-1]]
+    first[owner[hit[lead]]] = local[hit[lead]]
+    return first
+
+
+def _mirror4(xc, yc, x, y):
+    """The four symmetric ellipse pixels per step, in the ellipse steppers' order."""
+    xs = np.stack([xc + x, xc - x, xc + x, xc - x], axis=1).ravel()
+    ys = np.stack([yc + y, yc + y, yc - y, yc - y], axis=1).ravel()
+    return xs, ys
+
+
+def _mirror8(xc, yc, x, y):
+    """The eight symmetric circle pixels per step, in Circle.octant_pixel order."""
+    xs = np.stack([xc + x, xc - x, xc + x, xc - x, xc + y, xc - y, xc + y, xc - y], axis=1).ravel()
+    ys = np.stack([yc + y, yc + y, yc - y, yc - y, yc + x, yc + x, yc - x, yc - x], axis=1).ravel()
+    return xs, ys
+
+
+def _assemble(parts, n):
+    """
+    Join per-primitive pieces into one RasterBatch.
+
+    Each part is (counts, xs, ys, bad, fallback): counts[i] pixels of
+    primitive i, laid out in primitive order. Primitives flagged in bad
+    take fallback(i), a list of (x, y), instead. Parts are concatenated
+    per primitive in the order given.
+    """
+    sizes = []
+    for counts, xs, ys, bad, fallback in parts:
+        size = counts.copy()
+        patches = {int(i): _as_arrays(fallback(int(i))) for i in np.flatnonzero(bad)}
+        for i, (pxs, _) in patches.items():
+            size[i] = pxs.size
+        sizes.append((size, patches))
+
+    offsets = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(sum(size for size, _ in sizes), out=offsets[1:])
+    out_x = np.empty(offsets[-1], dtype=np.int64)
+    out_y = np.empty(offsets[-1], dtype=np.int64)
+
+    base = offsets[:-1].copy()
+    for (counts, xs, ys, bad, _), (size, patches) in zip(parts, sizes):
+        _, owner, local = _segments(counts)
+        good = ~bad[owner]
+        dest = base[owner[good]] + local[good]
+        out_x[dest] = xs[good]
+        out_y[dest] = ys[good]
+        for i, (pxs, pys) in patches.items():
+            out_x[base[i]:base[i] + pxs.size] = pxs
+            out_y[base[i]:base[i] + pys.size] = pys
+        base += size
+    return RasterBatch(offsets, out_x, out_y)
+
+
+# ----------------------------------------------------------------------
+# Closed-form step computations, batched over primitives
+# ----------------------------------------------------------------------
+def _circle_steps(r):
+    """
+    midpoint_circle's (x, y) at every step of every radius, flattened.
+
+    Returns (n, x, y, owner, bad): n[i] steps for radius i, and bad[i] when
+    the closed form failed the recurrence check for it.
+    """
+    count = len(r)
+    _, owner, k = _segments(np.where(r >= 0, r + 2, 0))
+    rr = r[owner]
+
+    # y stays put while the midpoint (x+1, y-1/2) is inside, which unrolls to
+    # the largest y with (2y - 1)^2 <= 4r^2 - 4x^2
+    y = (_isqrt(np.maximum(4 * rr * rr - 4 * k * k, 0)) + 1) // 2
+
+    n = _first_true(k > y, owner, k, count, 0)
+    keep = k < n[owner]
+    x, y, owner, rr = k[keep], y[keep], owner[keep], rr[keep]
+
+    # 4*d for each step; the loop steps y down when d >= 0
+    step_down = (4 * (x + 1) ** 2 + (2 * y - 1) ** 2 - 4 * rr * rr - 1) >= 0
+    following = y - step_down
+    last = x == n[owner] - 1
+
+    bad = np.zeros(count, dtype=bool)
+    bad[owner[:-1][~last[:-1] & (y[1:] != following[:-1])]] = True
+    bad[owner[last & (n[owner] <= following)]] = True
+    return n, x, y, owner, bad
+
+
+def _region1_steps(rx, ry):
+    """
+    Region 1's (x, y) at every step of every ellipse, flattened.
+
+    Returns (n, x, y, owner, bad, (x, y, rx2, ry2)) — the last being the
+    per-ellipse handoff region 2 starts from.
+    """
+    count = len(rx)
+    rx2 = rx * rx
+    ry2 = ry * ry
+    active = (rx2 > 0) & (ry > 0)
+    span = np.where(active, np.abs(rx) + np.abs(ry) + 2, 0)
+    _, owner, k = _segments(span)
+    a2, b2, b = rx2[owner], ry2[owner], ry[owner]
+
+    # Ellipse.py's d1 is 4x an integer; completing the square on its y terms
+    # gives "keep y while rx2*(2y - 3)^2 < T", i.e. 2y - 3 <= s for y >= 1
+    T = 4 * a2 * b2 - 4 * b2 * k * k - a2 * (8 * b - 8)
+    s = _isqrt(np.where(T > 0, (T - 1) // np.maximum(a2, 1), 0))
+    target = np.where(s > 0, np.minimum((s + 3) // 2, b), -span[owner])
+    target[k == 0] = b[k == 0]
+
+    # y drops at most one per step: y_k = max(target_k, y_(k-1) - 1)
+    y = _segment_max_scan(target + k, owner) - k
+
+    n = _first_true(b2 * k >= a2 * y, owner, k, count, -1)
+    bad = active & (n < 0)
+    n = np.maximum(n, 0)
+    keep = k < n[owner]
+    x, y, owner = k[keep], y[keep], owner[keep]
+    a2, b2, b = a2[keep], b2[keep], b[keep]
+
+    # 4*d1 for each step; the loop steps y down when d1 >= 0
+    d1 = 4 * b2 * (x + 1) ** 2 + a2 * (2 * y - 1) ** 2 - 4 * a2 * b2 + 8 * a2 * (b - y)
+    following = y - (d1 >= 0)
+    last = x == n[owner] - 1
+    bad[owner[:-1][~last[:-1] & (y[1:] != following[:-1])]] = True
+
+    # Handoff: the loop must stop exactly where the scan did
+    y_end = ry.copy()
+    y_end[owner[last]] = following[last]
+    bad |= (n > 0) & (ry2 * n < rx2 * y_end)
+    return n, x, y, owner, bad, (n.copy(), y_end, rx2, ry2)
+
+
+def _region2_steps(x0, y0, rx2, ry2):
+    """
+    Region 2's (x, y) at every step of every ellipse, flattened.
+
+    Returns (n, x, y, owner, bad) like _circle_steps.
+    """
+    count = len(x0)
+    bad = (y0 >= 0) & (ry2 == 0)
+    n = np.where((y0 >= 0) & ~bad, y0 + 1, 0)
+    offsets, owner, k = _segments(n)
+    a2, b2, start, top = rx2[owner], ry2[owner], x0[owner], y0[owner]
+    y = top - k
+
+    # Ellipse.py's d2 is 4x an integer; completing the square on its x terms
+    # gives "step x right while ry2*(2x + 3)^2 <= -R"
+    R = 4 * a2 * (y - 1) ** 2 - 4 * a2 * b2 + 8 * a2 * k - 8 * b2 - 8 * b2 * start
+    V = np.where(R <= 0, -R // np.maximum(b2, 1), 0)
+    reach = np.where(R <= 0, (_isqrt(V) - 3) // 2, start - 1)
+    previous = np.empty_like(reach)
+    previous[1:] = reach[:-1]
+
+    # While y >= 3 the reach only grows: x chases it at most one pixel per
+    # step and never moves left, which is a running minimum of reach - k
+    p = np.maximum(0, top - 2)
+    chase = np.where((k >= 1) & (k <= p), previous + 1 - k, start)
+    x = np.maximum(start, k + np.minimum(start, -_segment_max_scan(-chase, owner)))
+
+    # For the last steps the reach shrinks, so x steps right until it first
+    # passes it and then stays there
+    tail = k > p
+    x_p = x[offsets[owner] + p]
+    hits = np.bincount(owner[tail], weights=x_p[tail] + (k - p)[tail] - 1 <= previous[tail],
+                       minlength=count).astype(np.int64)
+    x = np.where(tail, x_p + np.minimum(k - p, hits[owner]), x)
+
+    step_right = b2 * (2 * x + 3) ** 2 + R <= 0
+    last = k == n[owner] - 1
+    bad[owner[:-1][~last[:-1] & (x[1:] != x[:-1] + step_right[:-1])]] = True
+    return n, x, y, owner, bad
+
+
+# ----------------------------------------------------------------------
+# Batched rasterizers (one call, many primitives)
+# ----------------------------------------------------------------------
+def dda_batch(x0, y0, x1, y1):
+    """
+    DDA lines as a RasterBatch.
+
+    x and y are running sums (see _running_sum), so every pixel rounds
+    the loop's own sequential float sum.
+    """
+    x0, y0, x1, y1 = _int_arrays(x0, y0, x1, y1)
+    dx = x1 - x0
+    dy = y1 - y0
+    steps = np.maximum(np.abs(dx), np.abs(dy))
+    if np.any(steps == 0):
+        raise ZeroDivisionError("dda() needs two distinct endpoints")
+
+    offsets, _, _ = _segments(steps + 1)
+    xs = np.rint(_running_sum(x0, dx / steps, steps + 1)).astype(np.int64)
+    ys = np.rint(_running_sum(y0, dy / steps, steps + 1)).astype(np.int64)
+    return RasterBatch(offsets, xs, ys)
+
+
+def bresenham_batch(x0, y0, x1, y1):
+    """
+    Bresenham lines as a RasterBatch, each needing x1 >= x0 like Line.bresenham.
+
+    Step k takes the y++ branch exactly when 2*dy*(k+1) + dx crosses the next
+    multiple of 2*dx, so y - y0 is floor((2*dy*k + dx) / (2*dx)). Clipping to
+    [0, k] reproduces the loop for slopes outside [0, 1], where it either
+    never or always steps.
+    """
+    x0, y0, x1, y1 = _int_arrays(x0, y0, x1, y1)
+    dx = x1 - x0
+    dy = y1 - y0
+    if np.any(dx < 0):
+        raise ValueError("bresenham() walks x upwards; need x1 >= x0")
+
+    offsets, owner, k = _segments(dx)
+    run, rise = dx[owner], dy[owner]
+    y = np.clip((2 * rise * k + run) // (2 * run), 0, k)
+    return RasterBatch(offsets, x0[owner] + k, y0[owner] + y)
+
+
+def circle_batch(xc, yc, r):
+    """Midpoint circles as a RasterBatch, eight symmetric pixels per step."""
+    xc, yc, r = _int_arrays(xc, yc, r)
+    n, x, y, owner, bad = _circle_steps(r)
+    parts = [(
+        8 * n, *_mirror8(xc[owner], yc[owner], x, y), bad,
+        lambda i: circle_reference(int(xc[i]), int(yc[i]), int(r[i])),
+    )]
+    return _assemble(parts, len(r))
+
+
+def ellipse_batch(xc, yc, rx, ry):
+    """Midpoint ellipses as a RasterBatch: each one's region 1, then region 2."""
+    xc, yc, rx, ry = _int_arrays(xc, yc, rx, ry)
+    n1, x1, y1, owner1, bad1, (hx, hy, rx2, ry2) = _region1_steps(rx, ry)
+
+    # Region 2 starts from region 1's handoff, so settle failures first
+    region1 = {}
+    for i in np.flatnonzero(bad1):
+        region1[i], (hx[i], hy[i], _, _) = ellipse_region1_reference(
+            int(xc[i]), int(yc[i]), int(rx[i]), int(ry[i]))
+
+    n2, x2, y2, owner2, bad2 = _region2_steps(hx, hy, rx2, ry2)
+    parts = [
+        (4 * n1, *_mirror4(xc[owner1], yc[owner1], x1, y1), bad1, region1.__getitem__),
+        (4 * n2, *_mirror4(xc[owner2], yc[owner2], x2, y2), bad2,
+         lambda i: ellipse_region2_reference(
+             int(xc[i]), int(yc[i]), int(rx[i]), int(ry[i]),
+             int(hx[i]), int(hy[i]), int(rx2[i]), int(ry2[i]))),
+    ]
+    return _assemble(parts, len(rx))
+
+
+def wu_batch(x0, y0, x1, y1):
+    """
+    Xiaolin Wu anti-aliased lines as a CoverageBatch, pixels in
+    wu_reference's order. Endpoints may be fractional.
+
+    Like dda_batch, the running intery += gradient is a _running_sum, so
+    every coverage is bit-for-bit the loop's.
+    """
+    x0, y0, x1, y1 = (np.ravel(v).astype(np.float64) for v in np.broadcast_arrays(x0, y0, x1, y1))
+    steep = np.abs(y1 - y0) > np.abs(x1 - x0)
+    x0, y0 = np.where(steep, y0, x0), np.where(steep, x0, y0)
+    x1, y1 = np.where(steep, y1, x1), np.where(steep, x1, y1)
+    back = x0 > x1
+    x0, x1 = np.where(back, x1, x0), np.where(back, x0, x1)
+    y0, y1 = np.where(back, y1, y0), np.where(back, y0, y1)
+    dx = x1 - x0
+    gradient = np.where(dx != 0, (y1 - y0) / np.where(dx != 0, dx, 1), 1.0)
+
+    def endpoint(x, y, gap):
+        xend = np.floor(x + 0.5)
+        yend = y + gradient * (xend - x)
+        base = np.floor(yend)
+        f = yend - base
+        return xend, yend, base, (1 - f) * gap, f * gap
+
+    lead = x0 + 0.5
+    xs, yend, base1, a1, b1 = endpoint(x0, y0, 1 - (lead - np.floor(lead)))
+    tail = x1 + 0.5
+    xe, _, base2, a2, b2 = endpoint(x1, y1, tail - np.floor(tail))
+
+    # Columns strictly between the endpoints, one intery per column
+    steps = np.maximum(xe - xs - 1, 0).astype(np.int64)
+    intery = _running_sum(yend + gradient, gradient, steps)
+    _, owner, k = _segments(steps)
+
+    counts = 2 * steps + 4
+    offsets = np.zeros(len(steps) + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+    total = int(offsets[-1])
+    u = np.empty(total)
+    v = np.empty(total)
+    coverage = np.empty(total)
+
+    first = offsets[:-1]
+    last = offsets[1:] - 2
+    for at, column, row, a, b in ((first, xs, base1, a1, b1), (last, xe, base2, a2, b2)):
+        u[at], v[at], coverage[at] = column, row, a
+        u[at + 1], v[at + 1], coverage[at + 1] = column, row + 1, b
+
+    at = offsets[owner] + 2 + 2 * k
+    row = np.floor(intery)
+    f = intery - row
+    u[at], v[at], coverage[at] = xs[owner] + 1 + k, row, 1 - f
+    u[at + 1], v[at + 1], coverage[at + 1] = xs[owner] + 1 + k, row + 1, f
+
+    flip = np.repeat(steep, counts)
+    xs_out = np.where(flip, v, u).astype(np.int64)
+    ys_out = np.where(flip, u, v).astype(np.int64)
+    return CoverageBatch(offsets, xs_out, ys_out, coverage)
+
+
+# ----------------------------------------------------------------------
+# Single-primitive rasterizers
+# ----------------------------------------------------------------------
+def polygon_spans(vertices):
+    """
+    Filled spans of a polygon with integer vertices, as (ys, starts, stops):
+    span k covers starts[k] <= x < stops[k] on scanline ys[k], in
+    polygon_fill_reference order. Empty spans are dropped.
+
+    Every edge's crossings come out at once from integer division: on
+    scanline ya + k the crossing is xa + k*dx/dy, and only its ceiling
+    matters, so sorting the ceilings pairs them exactly as the AET would.
+    """
+    v = np.asarray(vertices, dtype=np.int64).reshape(-1, 2)
+    a, b = v, np.roll(v, -1, axis=0)
+    flip = a[:, 1] > b[:, 1]
+    lo = np.where(flip[:, None], b, a)
+    hi = np.where(flip[:, None], a, b)
+    keep = lo[:, 1] < hi[:, 1]
+    lo, hi = lo[keep], hi[keep]
+
+    dx, dy = hi[:, 0] - lo[:, 0], hi[:, 1] - lo[:, 1]
+    _, owner, k = _segments(dy)
+    ys = lo[owner, 1] + k
+    xs = lo[owner, 0] - (-(k * dx[owner]) // dy[owner])   # ceil of the crossing
+
+    order = np.lexsort((xs, ys))
+    xs, ys = xs[order], ys[order]
+    starts, stops, ys = xs[0::2], xs[1::2], ys[0::2]
+    filled = starts < stops
+    return ys[filled], starts[filled], stops[filled]
+
+
+def polygon_fill(vertices):
+    """Filled pixels of a polygon with integer vertices as (xs, ys), scanline by scanline."""
+    ys, starts, stops = polygon_spans(vertices)
+    _, owner, k = _segments(stops - starts)
+    return starts[owner] + k, ys[owner]
+
+
+def dda(x0, y0, x1, y1):
+    """
+    DDA line as (xs, ys).
+
+    The loop's running x += x_inc is a sequential float sum, and so is
+    np.cumsum, so every intermediate value (and its round-half-even) matches.
+    """
+    _, xs, ys = dda_batch(x0, y0, x1, y1)
+    return xs, ys
+
+
+def bresenham(x0, y0, x1, y1):
+    """Bresenham line as (xs, ys), for x1 >= x0 like Line.bresenham."""
+    _, xs, ys = bresenham_batch(x0, y0, x1, y1)
+    return xs, ys
+
+
+def wu(x0, y0, x1, y1):
+    """Anti-aliased line as (xs, ys, coverage)."""
+    _, xs, ys, coverage = wu_batch(x0, y0, x1, y1)
+    return xs, ys, coverage
+
+
+def midpoint_circle(xc, yc, r):
+    """Midpoint circle as (xs, ys), eight symmetric pixels per step."""
+    _, xs, ys = circle_batch(xc, yc, r)
+    return xs, ys
+
+
+def ellipse_region1(xc, yc, rx, ry):
+    """Region 1 as (xs, ys, (x, y, rx2, ry2)), the handoff for region 2."""
+    _, x, y, _, bad, handoff = _region1_steps(*_int_arrays(rx, ry))
+    if bad[0]:
+        pixels, handoff = ellipse_region1_reference(xc, yc, rx, ry)
+        return (*_as_arrays(pixels), handoff)
+    return (*_mirror4(xc, yc, x, y), tuple(int(v[0]) for v in handoff))
+
+
+def ellipse_region2(xc, yc, rx, ry, x, y, rx2, ry2):
+    """Region 2 as (xs, ys), continuing from region 1's handoff."""
+    _, x2, y2, _, bad = _region2_steps(*_int_arrays(x, y, rx2, ry2))
+    if bad[0]:
+        return _as_arrays(ellipse_region2_reference(xc, yc, rx, ry, x, y, rx2, ry2))
+    return _mirror4(xc, yc, x2, y2)
+
+
+def midpoint_ellipse(xc, yc, rx, ry):
+    """Midpoint ellipse as (xs, ys): region 1 pixels, then region 2."""
+    _, xs, ys = ellipse_batch(xc, yc, rx, ry)
+    return xs, ys
+
+
+# ----------------------------------------------------------------------
+# Clipping against a rows x cols grid (pixels 0 <= x < rows, 0 <= y < cols)
+# ----------------------------------------------------------------------
+INSIDE, LEFT, RIGHT, BOTTOM, TOP = 0, 1, 2, 4, 8
+
+
+def outcode(x, y, rows, cols):
+    """Cohen–Sutherland region code of pixel (x, y)."""
+    code = INSIDE
+    if x < 0:
+        code |= LEFT
+    elif x >= rows:
+        code |= RIGHT
+    if y < 0:
+        code |= BOTTOM
+    elif y >= cols:
+        code |= TOP
+    return code
+
+
+def _box_outside(x0, y0, x1, y1, rows, cols):
+    """Trivial reject: the box spanned by two corners lies wholly on one side of the grid."""
+    low = outcode(min(x0, x1), min(y0, y1), rows, cols)
+    high = outcode(max(x0, x1), max(y0, y1), rows, cols)
+    return bool(low & high)
+
+
+def _on_grid(xs, ys, rows, cols):
+    return (0 <= xs) & (xs < rows) & (0 <= ys) & (ys < cols)
+
+
+def _bresenham_y(x0, y0, x1, y1, k):
+    """y of Line.bresenham's step k, from bresenham_batch's closed form."""
+    dx, dy = x1 - x0, y1 - y0
+    return y0 + min(max((2 * dy * k + dx) // (2 * dx), 0), k)
+
+
+def clip_bresenham(x0, y0, x1, y1, rows, cols):
+    """
+    Steps of Line.bresenham (step k plots pixel x0 + k) that land on the
+    grid, as a range.
+
+    Clipping the segment and rasterizing what is left would light
+    different pixels, so this clips the step index instead, Liang–Barsky
+    style: each grid edge bounds k from one side. x and y never decrease
+    along the line, so every bound is found exactly by bisection.
+    """
+    dx = x1 - x0
+    if dx < 0:
+        raise ValueError("bresenham() walks x upwards; need x1 >= x0")
+    if dx == 0:
+        return range(0)
+
+    def y(k):
+        return _bresenham_y(x0, y0, x1, y1, k)
+
+    if _box_outside(x0, y0, x1 - 1, y(dx - 1), rows, cols):
+        return range(0)
+    steps = range(dx)
+    first = max(0, -x0, bisect_left(steps, 0, key=y))
+    stop = min(dx, rows - x0, bisect_left(steps, cols, key=y))
+    return range(first, max(first, stop))
+
+
+def bresenham_state(x0, y0, x1, y1, k):
+    """(x, y, P) of Line.bresenham at the top of step k."""
+    dx, dy = x1 - x0, y1 - y0
+    y = _bresenham_y(x0, y0, x1, y1, k)
+    return x0 + k, y, 2 * dy * (k + 1) - dx - 2 * dx * (y - y0)
+
+
+def clip_dda(x0, y0, x1, y1, rows, cols):
+    """
+    Steps of dda_manim.dda (step i plots its i-th pixel) that land on the
+    grid, as a range.
+
+    Like clip_bresenham this clips the step index, not the segment. Both
+    rounded coordinates are monotone along the line, so the visible steps
+    are one contiguous run.
+    """
+    if _box_outside(x0, y0, x1, y1, rows, cols):
+        return range(0)
+    on = np.flatnonzero(_on_grid(*dda(x0, y0, x1, y1), rows, cols))
+    if not on.size:
+        return range(0)
+    return range(int(on[0]), int(on[-1]) + 1)
+
+
+def dda_state(x0, y0, x1, y1, k):
+    """(x, y) of dda_manim.dda at the top of step k, summed the loop's way."""
+    steps = max(abs(x1 - x0), abs(y1 - y0))
+    x_inc, y_inc = (x1 - x0) / steps, (y1 - y0) / steps
+    x, y = float(x0), float(y0)
+    for _ in range(k):
+        x += x_inc
+        y += y_inc
+    return x, y
+
+
+def _symmetric_steps(xs, ys, xc, yc, width, rows, cols):
+    """(x, y, visible) per step of a rasterizer that plots `width` mirrored pixels per step."""
+    visible = _on_grid(xs, ys, rows, cols).reshape(-1, width)
+    return xs[0::width] - xc, ys[0::width] - yc, visible
+
+
+def clip_circle(xc, yc, r, rows, cols):
+    """
+    Circle.midpoint_circle's steps as (x, y, visible), where visible[k]
+    marks which of step k's eight pixels (one per octant, in
+    Circle.octant_pixel order) are on the grid. A circle whose bounding
+    box misses the grid is rejected before any step is computed.
+    """
+    if _box_outside(xc - r, yc - r, xc + r, yc + r, rows, cols):
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty, np.zeros((0, 8), dtype=bool)
+    return _symmetric_steps(*midpoint_circle(xc, yc, r), xc, yc, 8, rows, cols)
+
+
+def clip_ellipse_region1(xc, yc, rx, ry, rows, cols):
+    """
+    Ellipse.region1_algorithm's steps as (x, y, visible, handoff), one
+    visible column per quadrant in the order the ellipse steppers list
+    them. The handoff is returned even when nothing is visible, as region
+    2 starts from it.
+    """
+    xs, ys, handoff = ellipse_region1(xc, yc, rx, ry)
+    return (*_symmetric_steps(xs, ys, xc, yc, 4, rows, cols), handoff)
+
+
+def clip_ellipse_region2(xc, yc, rx, ry, x, y, rx2, ry2, rows, cols):
+    """Ellipse.region2_algorithm's steps as (x, y, visible), like clip_ellipse_region1."""
+    if _box_outside(xc - rx, yc - ry, xc + rx, yc + ry, rows, cols):
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty, np.zeros((0, 4), dtype=bool)
+    xs, ys = ellipse_region2(xc, yc, rx, ry, x, y, rx2, ry2)
+    return _symmetric_steps(xs, ys, xc, yc, 4, rows, cols)
+
+
+def circle_decision(x, y, r):
+    """Circle.midpoint_circle's d at the top of the step drawing (x, y)."""
+    return (x + 1) ** 2 + y * y - y - r * r
+
+
+def region1_decision(x, y, rx, ry):
+    """Ellipse region 1's d1 at the top of the step drawing (x, y)."""
+    rx2, ry2 = rx * rx, ry * ry
+    return (4 * ry2 * (x + 1) ** 2 + rx2 * (2 * y - 1) ** 2 - 4 * rx2 * ry2 + 8 * rx2 * (ry - y)) / 4
+
+
+def region2_decision(x, y, x0, y0, rx2, ry2):
+    """Ellipse region 2's d2 at the top of the step drawing (x, y), having started at (x0, y0)."""
+    return ry2 * (x + 0.5) ** 2 + rx2 * (y - 1) ** 2 - rx2 * ry2 + 2 * rx2 * (y0 - y) + 2 * ry2 * (x - x0)
+
+
+# ----------------------------------------------------------------------
+# Verifier
+# ----------------------------------------------------------------------
+def _same(label, got, expected):
+    xs, ys = _as_arrays(expected)
+    if not (np.array_equal(got[0], xs) and np.array_equal(got[1], ys)):
+        raise AssertionError(f"{label}: closed form disagrees with the loop")
+
+
+def _same_coverage(label, got, expected):
+    xs, ys = _as_arrays([(x, y) for x, y, _ in expected])
+    coverage = np.array([c for _, _, c in expected])
+    if not (np.array_equal(got[0], xs) and np.array_equal(got[1], ys)
+            and np.array_equal(got[2], coverage)):
+        raise AssertionError(f"{label}: closed form disagrees with the loop")
+
+
+def verify(size=40, trials=2000, seed=0):
+    """
+    Compare every closed form with its loop.
+
+    Exhaustive over small parameters (|coords| <= size), then `trials`
+    seeded random cases up to 50x that, single and batched. The curve
+    cases must also pass the recurrence check without falling back to the
+    loop. Returns the number of primitives checked; raises AssertionError
+    on any mismatch.
+    """
+    rng = np.random.default_rng(seed)
+    checked = 0
+
+    for dx in range(-size, size + 1):
+        for dy in range(-size, size + 1):
+            if (dx, dy) != (0, 0):
+                _same(f"dda{(0, 0, dx, dy)}", dda(0, 0, dx, dy), dda_reference(0, 0, dx, dy))
+                checked += 1
+            if dx >= 0:
+                _same(f"bresenham{(0, 0, dx, dy)}", bresenham(0, 0, dx, dy),
+                      bresenham_reference(0, 0, dx, dy))
+                checked += 1
+
+    x0, y0, x1, y1 = rng.integers(-50 * size, 50 * size, (4, trials))
+    x1 = np.where(x1 == x0, x1 + 1, x1)
+    lines = dda_batch(x0, y0, x1, y1)
+    for i in range(trials):
+        args = int(x0[i]), int(y0[i]), int(x1[i]), int(y1[i])
+        _same(f"dda_batch{args}", lines.pixels(i), dda_reference(*args))
+    x0, x1 = np.minimum(x0, x1), np.maximum(x0, x1)
+    lines = bresenham_batch(x0, y0, x1, y1)
+    for i in range(trials):
+        args = int(x0[i]), int(y0[i]), int(x1[i]), int(y1[i])
+        _same(f"bresenham_batch{args}", lines.pixels(i), bresenham_reference(*args))
+    checked += 2 * trials
+
+    for dx in range(-size // 4, size // 4 + 1):
+        for dy in range(-size // 4, size // 4 + 1):
+            _same_coverage(f"wu{(0, 0, dx, dy)}", wu(0, 0, dx, dy), wu_reference(0, 0, dx, dy))
+    ends = rng.uniform(-10 * size, 10 * size, (4, trials))
+    ends[:, : trials // 4] = np.round(ends[:, : trials // 4] * 2) / 2   # exact .5 ties
+    lines = wu_batch(*ends)
+    for i in range(trials):
+        args = tuple(float(v) for v in ends[:, i])
+        _same_coverage(f"wu_batch{args}", lines.pixels(i), wu_reference(*args))
+    checked += (2 * (size // 4) + 1) ** 2 + trials
+
+    radii = np.concatenate([np.arange(-2, 50 * size), rng.integers(0, 1000 * size, trials // 10)])
+    bad = _circle_steps(radii)[-1]
+    if bad.any():
+        raise AssertionError(f"circle r={radii[bad][0]}: recurrence check failed")
+    circles = circle_batch(3, -2, radii)
+    for i, r in enumerate(radii):
+        expected = circle_reference(3, -2, int(r))
+        _same(f"circle r={r}", circles.pixels(i), expected)
+        _same(f"circle r={r}", midpoint_circle(3, -2, int(r)), expected)
+    checked += radii.size
+
+    rx, ry = np.divmod(np.arange((size + 1) ** 2), size + 1)
+    rx = np.concatenate([rx, rng.integers(0, 50 * size, trials // 10)])
+    ry = np.concatenate([ry, rng.integers(0, 50 * size, trials // 10)])
+    *_, bad1, handoff = _region1_steps(rx, ry)
+    bad2 = _region2_steps(*handoff)[-1] & (handoff[3] > 0)
+    if (bad1 | bad2).any():
+        i = np.flatnonzero(bad1 | bad2)[0]
+        raise AssertionError(f"ellipse {rx[i]}x{ry[i]}: recurrence check failed")
+    ellipses = ellipse_batch(-4, 5, rx, ry)
+    for i in range(rx.size):
+        args = -4, 5, int(rx[i]), int(ry[i])
+        expected = ellipse_reference(*args)
+        _same(f"ellipse {args[2]}x{args[3]}", ellipses.pixels(i), expected)
+        _same(f"ellipse {args[2]}x{args[3]}", midpoint_ellipse(*args), expected)
+        xs1, ys1, handoff = ellipse_region1(*args)
+        pixels, expected = ellipse_region1_reference(*args)
+        _same(f"ellipse {args[2]}x{args[3]} region 1", (xs1, ys1), pixels)
+        if handoff != expected:
+            raise AssertionError(f"ellipse {args[2]}x{args[3]}: region 1 handoff differs")
+    checked += rx.size
+
+    # Clipping: a window or mask must keep exactly the loop's on-grid pixels
+    for _ in range(trials):
+        rows, cols = (int(v) for v in rng.integers(1, size, 2))
+        x0, y0 = (int(v) for v in rng.integers(-size, 2 * size, 2))
+        x1, y1 = x0 + int(rng.integers(0, 2 * size)), y0 + int(rng.integers(-2 * size, 2 * size))
+        expected = [k for k, (x, y) in enumerate(bresenham_reference(x0, y0, x1, y1))
+                    if outcode(x, y, rows, cols) == INSIDE]
+        if list(clip_bresenham(x0, y0, x1, y1, rows, cols)) != expected:
+            raise AssertionError(f"clip_bresenham{(x0, y0, x1, y1, rows, cols)}: wrong window")
+        if (x0, y0) != (x1, y1):
+            expected = [k for k, (x, y) in enumerate(dda_reference(x0, y0, x1, y1))
+                        if outcode(x, y, rows, cols) == INSIDE]
+            steps = clip_dda(x0, y0, x1, y1, rows, cols)
+            if list(steps) != expected:
+                raise AssertionError(f"clip_dda{(x0, y0, x1, y1, rows, cols)}: wrong window")
+            x, y = dda_state(x0, y0, x1, y1, steps.start) if steps else (0.0, 0.0)
+            if steps and (round(x), round(y)) != dda_reference(x0, y0, x1, y1)[steps.start]:
+                raise AssertionError(f"dda_state{(x0, y0, x1, y1, steps.start)}: wrong state")
+
+        xc, yc = (int(v) for v in rng.integers(-size, 2 * size, 2))
+        r, ry = (int(v) for v in rng.integers(0, 2 * size, 2))
+        pixels, handoff = ellipse_region1_reference(xc, yc, r, ry)
+        for label, visible, pixels in (
+            ("clip_circle", clip_circle(xc, yc, r, rows, cols)[2], circle_reference(xc, yc, r)),
+            ("clip_ellipse_region1", clip_ellipse_region1(xc, yc, r, ry, rows, cols)[2], pixels),
+            ("clip_ellipse_region2", clip_ellipse_region2(xc, yc, r, ry, *handoff, rows, cols)[2],
+             ellipse_region2_reference(xc, yc, r, ry, *handoff)),
+        ):
+            on_grid = [outcode(x, y, rows, cols) == INSIDE for x, y in pixels]
+            if visible.size == 0 and not any(on_grid):
+                continue   # rejected up front
+            if visible.ravel().tolist() != on_grid:
+                raise AssertionError(f"{label}{(xc, yc, r, ry, rows, cols)}: wrong mask")
+    checked += 5 * trials
+
+    for n in (3, 4, 5, 8, 13):
+        polygons = rng.integers(-size, size + 1, (trials // 20, n, 2))
+        # Again far from the origin, where the integer crossings get large
+        for vertices in chain(polygons, polygons + rng.integers(-10**6, 10**6, 2)):
+            vertices = vertices.tolist()
+            _same(f"polygon{vertices}", polygon_fill(vertices), polygon_fill_reference(vertices))
+            checked += 1
+
+    return checked
+
+
+if __name__ == "__main__":
+    print(f"Rasterlib: {verify()} primitives match their loops")
@@ -1,7 +1,21 @@
+from contextlib import contextmanager
+
 from manim import *
-from collections import deque
+from Profiler import phase
 
 class ManimStack:
+    """
+    Animated stack whose contents can grow far past what fits on screen.
+
+    The logical contents are a plain list of label strings (top at the end),
+    so a push or pop costs the same however deep the stack is. Boxes and
+    labels exist only for the top max_visible entries: an entry gets its
+    mobjects when it scrolls into view and drops them when it scrolls out.
+
+    Pushes and pops made inside `with stack.batch():` (or via push_many /
+    pop_many) only touch that list, and the net change to the window is
+    played as one animation when the block ends.
+    """
     def __init__(self, 
                  box_width=2.5, 
                  box_height=0.4, 
@@ -25,8 +39,7 @@ class ManimStack:
         self.pop_color = pop_color
         self.stack_center = stack_center
         
-        self.all_boxes = deque()
-        self.all_labels = deque()
+        self.items = []                # logical contents, top at the end
         self.visible_boxes = VGroup()
         self.visible_labels = VGroup()
         
@@ -36,6 +49,10 @@ class ManimStack:
         self._slot_boxes = []   # invisible layout anchors, one per visible slot
         
         self.scene = None
+        
+        self._batch_depth = 0
+        self._batch_start = 0   # len(items) when the outermost batch opened
+        self._batch_low = 0     # lowest len(items) seen since then
     
     def make_stack(self, initial_count=5):
         """Create the stack. Use initial_count=0 to start empty."""
@@ -67,29 +84,13 @@ class ManimStack:
             for _ in range(self.max_visible)
         ]
 
-        initial_boxes = []
-        initial_labels = []
-        
-        if initial_count > 0:
-            initial_boxes = [
-                RoundedRectangle(
-                    width=self.box_width, 
-                    height=self.box_height, 
-                    corner_radius=self.box_corner_radius, 
-                    color=self.base_color, 
-                    fill_opacity=0.4,
-                    stroke_opacity=1
-                )
-                for _ in range(initial_count)
-            ]
-            
-            initial_labels = [
-                Text(".", font_size=self.font_size).move_to(box)
-                for box in initial_boxes
-            ]
-            
-            self.all_boxes.extend(initial_boxes)
-            self.all_labels.extend(initial_labels)
+        self.items.extend(["."] * initial_count)
+        initial_cells = [
+            self._make_cell(".", self.base_color, 0.4)
+            for _ in range(min(initial_count, self.max_visible))
+        ]
+        initial_boxes  = [box for box, _ in initial_cells]
+        initial_labels = [label for _, label in initial_cells]
         
         self.visible_boxes = VGroup(*initial_boxes)
         self.visible_labels = VGroup(*initial_labels)
@@ -112,36 +113,37 @@ class ManimStack:
         """Scene-space centre of visible slot i (0 = top)."""
         return self._slot_boxes[i].get_center()
 
+    def _make_cell(self, text, color, fill_opacity):
+        """Box and label for one visible entry."""
+        box = RoundedRectangle(
+            width=self.box_width,
+            height=self.box_height,
+            corner_radius=self.box_corner_radius,
+            color=color,
+            fill_opacity=fill_opacity
+        )
+        label = Text(text, font_size=self.font_size).move_to(box)
+        return box, label
+
     # ------------------------------------------------------------------
+    @phase("stack_push")
     def add_element(self, text):
         if not self.scene:
             raise ValueError("Scene not set. Call set_scene() first.")
         
-        new_box = RoundedRectangle(
-            width=self.box_width, 
-            height=self.box_height, 
-            corner_radius=self.box_corner_radius, 
-            color=self.add_color, 
-            fill_opacity=0.5
-        )
-        new_box.move_to(self.top_box)
-        new_label = Text(text, font_size=self.font_size).move_to(new_box)
+        if self._batch_depth:
+            self.items.append(text)
+            return
         
+        new_box, new_label = self._make_cell(text, self.add_color, 0.5)
+        new_box.move_to(self.top_box)
+        new_label.move_to(new_box)
         self.scene.add(new_box, new_label)
         
-        self.all_boxes.appendleft(new_box)
-        self.all_labels.appendleft(new_label)
-        
-        # Element that scrolls off the bottom when stack overflows
-        if len(self.all_boxes) > self.max_visible:
-            outgoing_box   = self.all_boxes[self.max_visible]
-            outgoing_label = self.all_labels[self.max_visible]
-        else:
-            outgoing_box   = None
-            outgoing_label = None
+        self.items.append(text)
         
         current_visible = len(self.visible_boxes)  # count before insertion
-
+        
         # New element drops into slot 0
         animations = [
             new_box.animate.move_to(self._slot_pos(0)),
@@ -155,11 +157,17 @@ class ManimStack:
                 self.visible_labels[i].animate.move_to(self._slot_pos(i + 1)),
             ])
         
-        if outgoing_box:
+        # Element that scrolls off the bottom when the window is full
+        if current_visible == self.max_visible:
+            outgoing_box   = self.visible_boxes[-1]
+            outgoing_label = self.visible_labels[-1]
             animations.extend([
                 FadeOut(outgoing_box,   shift=DOWN),
                 FadeOut(outgoing_label, shift=DOWN),
             ])
+        else:
+            outgoing_box   = None
+            outgoing_label = None
         
         self.scene.play(*animations, run_time=1)
         
@@ -167,8 +175,8 @@ class ManimStack:
         if current_visible > 0:
             self.visible_boxes[0].set_color(self.base_color).set_fill(opacity=0.4)
         
-        # Remove outgoing element from visible groups
-        if outgoing_box and outgoing_box in self.visible_boxes:
+        # Scrolled-off entries keep only their string in self.items
+        if outgoing_box is not None:
             self.visible_boxes.remove(outgoing_box)
             self.visible_labels.remove(outgoing_label)
             self.scene.remove(outgoing_box, outgoing_label)
@@ -176,34 +184,24 @@ class ManimStack:
         # Insert new element at the front
         self.visible_boxes.insert(0, new_box)
         self.visible_labels.insert(0, new_label)
-        
-        # Enforce cap
-        while len(self.visible_boxes) > self.max_visible:
-            extra_box   = self.visible_boxes[self.max_visible]
-            extra_label = self.visible_labels[self.max_visible]
-            self.visible_boxes.remove(extra_box)
-            self.visible_labels.remove(extra_label)
-            self.scene.remove(extra_box, extra_label)
 
     # ------------------------------------------------------------------
+    @phase("stack_pop")
     def pop_element(self):
         if not self.scene:
             raise ValueError("Scene not set. Call set_scene() first.")
         
-        if len(self.visible_boxes) == 0:
+        if not self.items:
+            return
+        
+        self.items.pop()
+        if self._batch_depth:
+            self._batch_low = min(self._batch_low, len(self.items))
             return
         
         top_box   = self.visible_boxes[0]
         top_label = self.visible_labels[0]
         
-        if len(self.all_boxes) > self.max_visible:
-            incoming_box   = self.all_boxes[self.max_visible]
-            incoming_label = self.all_labels[self.max_visible]
-            incoming_box.set_color(self.base_color).set_fill(opacity=0.4)
-        else:
-            incoming_box   = None
-            incoming_label = None
-        
         # Flash top element red before removing
         self.scene.play(
             top_box.animate.set_color(self.pop_color).set_fill(opacity=0.7),
@@ -214,15 +212,19 @@ class ManimStack:
         
         animations = []
         current_visible = len(self.visible_boxes)  # includes top (about to leave)
-
+        
         # Shift remaining visible elements up one slot
-        for i in range(min(current_visible - 1, self.max_visible - 1)):
+        for i in range(1, current_visible):
             animations.extend([
-                self.visible_boxes[i + 1].animate.move_to(self._slot_pos(i)),
-                self.visible_labels[i + 1].animate.move_to(self._slot_pos(i)),
+                self.visible_boxes[i].animate.move_to(self._slot_pos(i - 1)),
+                self.visible_labels[i].animate.move_to(self._slot_pos(i - 1)),
             ])
         
-        if incoming_box:
+        # The entry just below the window scrolls into the last slot
+        if len(self.items) >= self.max_visible:
+            incoming_box, incoming_label = self._make_cell(
+                self.items[-self.max_visible], self.base_color, 0.4
+            )
             incoming_box.move_to(self.bottom_box)
             incoming_label.move_to(incoming_box)
             self.scene.add(incoming_box, incoming_label)
@@ -231,13 +233,8 @@ class ManimStack:
                 incoming_label.animate.move_to(self._slot_pos(self.max_visible - 1)),
             ])
         else:
-            if current_visible >= self.max_visible:
-                bottom_box   = self.visible_boxes[self.max_visible - 1]
-                bottom_label = self.visible_labels[self.max_visible - 1]
-                animations.extend([
-                    FadeOut(bottom_box,   shift=UP),
-                    FadeOut(bottom_label, shift=UP),
-                ])
+            incoming_box   = None
+            incoming_label = None
         
         animations.extend([
             FadeOut(top_box,   shift=UP),
@@ -246,38 +243,123 @@ class ManimStack:
         
         self.scene.play(*animations, run_time=1)
         
-        if top_box in self.all_boxes:
-            self.all_boxes.remove(top_box)
-            self.all_labels.remove(top_label)
-        
-        if top_box in self.visible_boxes:
-            self.visible_boxes.remove(top_box)
-            self.visible_labels.remove(top_label)
+        self.visible_boxes.remove(top_box)
+        self.visible_labels.remove(top_label)
         self.scene.remove(top_box, top_label)
         
-        if incoming_box:
+        if incoming_box is not None:
             self.visible_boxes.add(incoming_box)
             self.visible_labels.add(incoming_label)
         
-        # Rebuild visible groups from storage
-        self.visible_boxes = VGroup(*list(self.all_boxes)[:self.max_visible])
-        self.visible_labels = VGroup(*list(self.all_labels)[:self.max_visible])
+        for box in self.visible_boxes:
+            box.set_color(self.base_color).set_fill(opacity=0.4)
+
+    # ------------------------------------------------------------------
+    @contextmanager
+    def batch(self, run_time=1):
+        """
+        Fold every push and pop inside the block into a single play.
+
+        Only the net change to the window is animated: cells still visible
+        slide to their new slots, popped ones flash and fade upward, and
+        entries that came into view slide in from the top (pushed) or the
+        bottom (uncovered). Nested batches settle with the outermost one.
+        """
+        if not self.scene:
+            raise ValueError("Scene not set. Call set_scene() first.")
+        
+        if self._batch_depth == 0:
+            self._batch_start = self._batch_low = len(self.items)
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+        if self._batch_depth == 0:
+            self._settle(run_time)
+
+    def push_many(self, texts, run_time=1):
+        with self.batch(run_time):
+            for text in texts:
+                self.add_element(text)
+
+    def pop_many(self, count, run_time=1):
+        with self.batch(run_time):
+            for _ in range(count):
+                self.pop_element()
+
+    @phase("stack_batch")
+    def _settle(self, run_time):
+        """
+        Animate the window from its pre-batch contents to self.items.
+        With run_time=0 the window jumps straight to its end state.
+        """
+        start, end, low = self._batch_start, len(self.items), self._batch_low
+        if start == end == low:
+            return
         
-        for i in range(len(self.visible_boxes)):
-            self.visible_boxes[i].set_color(self.base_color).set_fill(opacity=0.4)
+        # Slot s shows items[n - 1 - s]; entries below index low were
+        # never popped, so their cells can carry over
+        new_boxes  = [None] * min(end, self.max_visible)
+        new_labels = [None] * len(new_boxes)
+        moves = []    # (mobject, slot it ends in)
+        fades = []    # (mobject, direction it leaves in)
+        
+        for s, (box, label) in enumerate(zip(self.visible_boxes, self.visible_labels)):
+            k = start - 1 - s
+            t = end - 1 - k
+            if k >= low:
+                box.set_color(self.pop_color).set_fill(opacity=0.7)
+                label.set_color(self.pop_color)
+                fades.extend([(box, UP), (label, UP)])
+            elif t < self.max_visible:
+                new_boxes[t], new_labels[t] = box, label
+                moves.extend([(box, t), (label, t)])
+            else:
+                fades.extend([(box, DOWN), (label, DOWN)])
+        
+        for t in range(len(new_boxes)):
+            if new_boxes[t] is not None:
+                continue
+            k = end - 1 - t
+            pushed = k >= low
+            if t == 0 and pushed:
+                box, label = self._make_cell(self.items[k], self.add_color, 0.5)
+            else:
+                box, label = self._make_cell(self.items[k], self.base_color, 0.4)
+            box.move_to(self.top_box if pushed else self.bottom_box)
+            label.move_to(box)
+            self.scene.add(box, label)
+            new_boxes[t], new_labels[t] = box, label
+            moves.extend([(box, t), (label, t)])
+        
+        if run_time > 0:
+            self.scene.play(
+                *[mob.animate.move_to(self._slot_pos(t)) for mob, t in moves],
+                *[FadeOut(mob, shift=direction) for mob, direction in fades],
+                run_time=run_time
+            )
+        else:
+            for mob, t in moves:
+                mob.move_to(self._slot_pos(t))
+        self.scene.remove(*[mob for mob, _ in fades])
+        
+        for box in new_boxes[1:]:
+            box.set_color(self.base_color).set_fill(opacity=0.4)
+        self.visible_boxes  = VGroup(*new_boxes)
+        self.visible_labels = VGroup(*new_labels)
 
     # ------------------------------------------------------------------
     def get_visible_count(self):
         return len(self.visible_boxes)
     
     def get_all_count(self):
-        return len(self.all_boxes)
+        return len(self.items)
     
     def clear(self):
         if self.scene:
             for box, label in zip(self.visible_boxes, self.visible_labels):
                 self.scene.remove(box, label)
-        self.all_boxes.clear()
-        self.all_labels.clear()
+        self.items.clear()
         self.visible_boxes  = VGroup()
-        self.visible_labels = VGroup()
\ No newline at end of file
+        self.visible_labels = VGroup()
@@ -0,0 +1,131 @@
+"""
+Persistent cache for Text geometry, shared by every scene and every run.
+
+cached_text() is a drop-in for the Text(...) calls the scenes make. Glyph
+outlines are keyed by (string, font, font_size, weight) — colour is applied
+afterwards — and stored as .npz files, so a value like "x = 3" is laid out
+by Pango once and then read back as plain point arrays.
+
+    RASTER_TEXT_CACHE   cache directory (default ~/.cache/raster/text)
+    RASTER_TEXT_CACHE_MB   size cap before least-recently-used files go
+"""
+import hashlib
+import os
+import zipfile
+from collections import OrderedDict
+
+from manim import *
+from manim import __version__ as manim_version
+from Profiler import phase
+
+CACHE_DIR = os.environ.get(
+    "RASTER_TEXT_CACHE", os.path.join(os.path.expanduser("~"), ".cache", "raster", "text")
+)
+MAX_BYTES = int(float(os.environ.get("RASTER_TEXT_CACHE_MB", 64)) * 2**20)
+LOW_WATER = int(MAX_BYTES * 0.8)   # eviction trims down to this, leaving room to grow
+MEMORY_ITEMS = 1024
+
+_memory = OrderedDict()   # key -> list of per-glyph point arrays, LRU order
+_disk_bytes = None        # running size of the cache directory, None until first scanned
+
+
+def _key(text, font, font_size, weight):
+    raw = repr((manim_version, text, font, float(font_size), str(weight)))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _evict():
+    """
+    Size of the cache directory as it is on disk. Once that is over
+    MAX_BYTES, least-recently-used files are dropped until it is under
+    LOW_WATER, so the next scan is many writes away.
+    """
+    entries = []
+    for entry in os.scandir(CACHE_DIR):
+        if entry.name.endswith(".npz"):
+            stat = entry.stat()
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+    total = sum(size for _, size, _ in entries)
+    if total <= MAX_BYTES:
+        return total
+    for _, size, path in sorted(entries):
+        if total <= LOW_WATER:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass   # another process got there first
+        total -= size
+    return total
+
+
+def _stored(path):
+    """
+    Count a file just written to the cache. The directory is only scanned
+    the first time and whenever the running total goes over MAX_BYTES, and
+    each scan resyncs the total with what parallel renders wrote too.
+    """
+    global _disk_bytes
+    size = os.path.getsize(path)
+    if _disk_bytes is not None and _disk_bytes + size <= MAX_BYTES:
+        _disk_bytes += size
+    else:
+        _disk_bytes = _evict()
+
+
+def _glyphs(text, font, font_size, weight):
+    key = _key(text, font, font_size, weight)
+    if key in _memory:
+        _memory.move_to_end(key)
+        return _memory[key]
+
+    path = os.path.join(CACHE_DIR, key + ".npz")
+    try:
+        with np.load(path) as data:
+            glyphs = [data[f"arr_{i}"] for i in range(len(data.files))]
+        os.utime(path)   # mark as recently used
+    except (FileNotFoundError, ValueError, OSError, zipfile.BadZipFile):
+        with phase("text_layout"):
+            rendered = Text(text, font=font, font_size=font_size, weight=weight)
+        glyphs = [glyph.points.copy() for glyph in rendered]
+
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp.npz"
+        np.savez(tmp, *glyphs)
+        os.replace(tmp, path)   # atomic, so parallel renders never see half a file
+        _stored(path)
+
+    _memory[key] = glyphs
+    if len(_memory) > MEMORY_ITEMS:
+        _memory.popitem(last=False)
+    return glyphs
+
+
+@phase("text")
+def cached_text(text, font="", font_size=DEFAULT_FONT_SIZE, color=WHITE, weight=NORMAL):
+    """
+    Same outlines as Text(text, font=..., font_size=..., color=..., weight=...),
+    as a VGroup with one VMobject per glyph so text[i] still indexes glyphs.
+    """
+    mob = VGroup(*[
+        VMobject().set_points(points)
+        for points in _glyphs(text, font, font_size, weight)
+    ])
+    mob.set_fill(color, opacity=1).set_stroke(width=0)
+    return mob
+
+
+def retext(mob, text, font="", font_size=DEFAULT_FONT_SIZE, color=WHITE, weight=NORMAL):
+    """
+    Reshape a cached_text() VGroup in place to read `text`. Its glyph
+    VMobjects are reused, and only added or dropped when the length changes.
+    """
+    glyphs = _glyphs(text, font, font_size, weight)
+    while len(mob) > len(glyphs):
+        mob.remove(mob[-1])
+    while len(mob) < len(glyphs):
+        mob.add(VMobject())
+    for glyph, points in zip(mob, glyphs):
+        glyph.set_points(points)
+    mob.set_fill(color, opacity=1).set_stroke(width=0)
+    return mob
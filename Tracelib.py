@@ -0,0 +1,554 @@
+"""
+Record-once traces of the animated algorithms — no manim needed.
+
+Each iter_* stepper is a generator that runs an algorithm and yields one
+Step per highlighted pseudocode line: the line number, the variables after
+that line ran, the pixels it wrote and how long the scene waits there. Nothing runs until a step is asked for, so consumers
+pull only what they use:
+
+    first = list(islice(iter_circle(0, 0, 500), 100))        # stop early
+    rest = islice(iter_bresenham(0, 0, 40, 20), 30, None)    # skip 30 steps
+    for a, b in zip(iter_dda(*line), iter_bresenham(*line)):  # lockstep
+
+The scenes (Line.bresenham, Circle.midpoint_circle, ...) are driven by
+these steppers: they highlight each step's line, write its pixels and
+annotate the decision state it carries with their own labels, flashes and
+paced waits. Passing size=(rows, cols) clips a stepper to a grid that
+size, which is how the scenes animate only the visible part of a partly
+off-grid shape.
+
+Each *_trace function drains its stepper into a Trace. Player.play_steps
+animates any step iterable as it arrives and Player.play_trace any Trace,
+so traces can be computed in bulk, saved with save_trace and rendered later.
+"""
+import json
+import math
+from collections import namedtuple
+
+import numpy as np
+
+from Rasterlib import (
+    bresenham_state, circle_decision, clip_bresenham, clip_circle, clip_dda, clip_ellipse_region1,
+    clip_ellipse_region2, dda_state, region1_decision, region2_decision,
+)
+
+
+# pixels holds (x, y, color) tuples, or (x, y, color, coverage) for
+# anti-aliased writes
+Step = namedtuple("Step", ["index", "line", "values", "pixels", "wait"])
+Trace = namedtuple("Trace", ["algorithm", "code", "steps"])
+
+# Hex values of the manim colours the scenes use
+BLUE = "#58C4DD"
+WHITE = "#FFFFFF"
+YELLOW = "#FFFF00"
+
+
+# ----------------------------------------------------------------------
+# Pseudocode listings (line numbers below refer to these)
+# ----------------------------------------------------------------------
+DDA_CODE = [
+    "void dda(int x0, int y0, int x1, int y1) {",
+    "   int dx = x1 - x0;",
+    "   int dy = y1 - y0;",
+    "   int steps = max(abs(dx), abs(dy));",
+    "   float x_inc = dx / (float)steps;",
+    "   float y_inc = dy / (float)steps;",
+    "   float x = x0, y = y0;",
+    "   for (int i = 0; i <= steps; i++) {",
+    "      putpixel(round(x), round(y));",
+    "      x += x_inc;",
+    "      y += y_inc;",
+    "   }",
+    "}",
+]
+
+BRESENHAM_CODE = [
+    "void bresenham(int x0, int y0, int x1, int y1) {",
+    "   int dx = x1 - x0;",
+    "   int dy = y1 - y0;",
+    "   int x = x0;",
+    "   int y = y0;",
+    "   int P = 2*dy - dx;",
+    "   while (x != x1) {",
+    "      putpixel(x, y);",
+    "      if (P < 0)",
+    "         P += 2*dy;",
+    "      else",
+    "         y++;",
+    "         P += 2*dy - 2*dx;",
+    "      x++;",
+    "   }",
+    "}",
+]
+
+CIRCLE_CODE = [
+    "void circle(int xc, int yc, int r) {",                    #1
+    "   int x = 0, y = r, d = 1 - r;",                        #2
+    "   while (x <= y) {",                                    #3
+    "      putpixel(xc + x, yc + y);",                        #4
+    "      putpixel(xc - x, yc + y);",                        #5
+    "      putpixel(xc + x, yc - y);",                        #6
+    "      putpixel(xc - x, yc - y);",                        #7
+    "      putpixel(xc + y, yc + x);",                        #8
+    "      putpixel(xc - y, yc + x);",                        #9
+    "      putpixel(xc + y, yc - x);",                        #10
+    "      putpixel(xc - y, yc - x);",                        #11
+    "      if (d < 0) {",                                     #12
+    "         d += 2 * x + 3;",                               #13
+    "      } else {",                                         #14
+    "         d += 2 * (x - y) + 5;",                         #15
+    "         y--;",                                          #16
+    "      }",                                                #17
+    "      x++;",                                             #18
+    "   }",                                                   #19
+    "}",                                                      #20
+]
+
+ELLIPSE_REGION1_CODE = [
+    "void ellipse(int xc, int yc, int rx, int ry) {",   # 1
+    "   int x=0, y=ry;",                                 # 2
+    "   int rx2=rx*rx, ry2=ry*ry;",                      # 3
+    "   float d1 = ry2 - rx2*ry + 0.25*rx2;",           # 4
+    "   // Region 1: 2*ry2*x < 2*rx2*y",                # 5
+    "   while (2*ry2*x < 2*rx2*y) {",                   # 6
+    "      putpixel(xc±x, yc±y);",                      # 7
+    "      if (d1 < 0) {",                               # 8
+    "         d1 += 2*ry2*x + 3*ry2;",                  # 9
+    "      } else {",                                    # 10
+    "         y--;",                                     # 11
+    "         d1 += 2*ry2*x - 2*rx2*y + 3*ry2 + 2*rx2;",# 12
+    "      }",                                           # 13
+    "      x++;",                                        # 14
+    "   }",                                              # 15
+    "}",                                                 # 16
+]
+
+ELLIPSE_REGION2_CODE = [
+    "   // Region 2: 2*ry2*x >= 2*rx2*y",               # 1
+    "   float d2 = ry2*(x+0.5)*(x+0.5)",                 # 2
+    "          + rx2*(y-1)*(y-1) - rx2*ry2;",            # 3
+    "   while (y >= 0) {",                               # 4
+    "      putpixel(xc±x, yc±y);",                      # 5
+    "      if (d2 > 0) {",                               # 6
+    "         y--;",                                     # 7
+    "         d2 += -2*rx2*y + 3*rx2;",                  # 8
+    "      } else {",                                    # 9
+    "         x++;",                                     # 10
+    "         y--;",                                     # 11
+    "         d2 += 2*ry2*x - 2*rx2*y + 3*rx2 + 2*ry2;",# 12
+    "      }",                                           # 13
+    "   }",                                              # 14
+]
+
+BOUNDARY_FILL_CODE = [
+    "void boundaryFill(x, y, boundaryColor, fillColor) {",
+    "    color = getpixel(x, y);",
+    "    if (color == boundaryColor || color == fillColor)",
+    "        return;",
+    "    putpixel(x, y, fillColor);",
+    "    boundaryFill(x+1, y, boundaryColor, fillColor);",
+    "    boundaryFill(x-1, y, boundaryColor, fillColor);",
+    "    boundaryFill(x, y+1, boundaryColor, fillColor);",
+    "    boundaryFill(x, y-1, boundaryColor, fillColor);",
+    "}",
+]
+
+
+POLYGON_FILL_CODE = [
+    "void scanlineFill(Point v[], int n) {",
+    "    ET = buildEdgeTable(v, n);   // edges bucketed by ymin",
+    "    AET = {};",
+    "    for (y = ET.ymin; ET || AET; y++) {",
+    "        AET += ET[y];            // edges starting on this scanline",
+    "        AET -= edges with ymax == y;",
+    "        sort(AET by x);",
+    "        for (each pair e1, e2 in AET)",
+    "            fillSpan(y, ceil(e1.x), ceil(e2.x));",
+    "        for (each edge e in AET)",
+    "            e.x += e.invSlope;",
+    "    }",
+    "}",
+]
+
+
+WU_CODE = [
+    "void wu(float x0, float y0, float x1, float y1) {",
+    "   bool steep = abs(y1 - y0) > abs(x1 - x0);",
+    "   if (steep) { swap(x0, y0); swap(x1, y1); }",
+    "   if (x0 > x1) { swap(x0, x1); swap(y0, y1); }",
+    "   float gradient = (x1 == x0) ? 1 : (y1 - y0) / (x1 - x0);",
+    "   int xs = round(x0), xe = round(x1);",
+    "   float intery = endpoint(xs, x0, y0) + gradient;",
+    "   for (int x = xs + 1; x < xe; x++) {",
+    "      plot(x, floor(intery),     1 - fract(intery));",
+    "      plot(x, floor(intery) + 1, fract(intery));",
+    "      intery += gradient;",
+    "   }",
+    "   endpoint(xe, x1, y1);",
+    "}",
+]
+
+
+class _Counter:
+    """Builds the Steps of one run, numbering them as they are made."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, line, wait, pixels=(), **values):
+        step = Step(self.count, line, values, tuple(pixels), wait)
+        self.count += 1
+        return step
+
+
+# ----------------------------------------------------------------------
+# Steppers
+# ----------------------------------------------------------------------
+def iter_dda(x0, y0, x1, y1, color=BLUE, size=None):
+    """size=(rows, cols) walks only the steps whose pixel is on that grid."""
+    dx = x1 - x0
+    dy = y1 - y0
+    steps = max(abs(dx), abs(dy))
+
+    x_inc = dx / steps
+    y_inc = dy / steps
+
+    x = float(x0)
+    y = float(y0)
+    visible = range(steps + 1)
+    if size is not None:
+        visible = clip_dda(x0, y0, x1, y1, *size)
+        if visible:
+            x, y = dda_state(x0, y0, x1, y1, visible.start)
+
+    step = _Counter()
+    for i in visible:
+        yield step(9, 0.5, [(round(x), round(y), color)], i=i, steps=steps, x=x, y=y,
+                   x_inc=x_inc, y_inc=y_inc)
+        x += x_inc
+        yield step(10, 0.4, x=x)
+        y += y_inc
+        yield step(11, 0.4, y=y)
+
+
+def iter_bresenham(x0, y0, x1, y1, color=BLUE, size=None):
+    """size=(rows, cols) walks only the steps whose pixel is on that grid."""
+    dx = x1 - x0
+    dy = y1 - y0
+    x = x0
+    y = y0
+    P = 2*dy - dx
+    x_end = x1
+    if size is not None:
+        steps = clip_bresenham(x0, y0, x1, y1, *size)
+        x, y, P = (int(v) for v in bresenham_state(x0, y0, x1, y1, steps.start))
+        x_end = x0 + steps.stop
+
+    step = _Counter()
+    while x != x_end:
+        yield step(8, 0.5, [(x, y, color)], P=P, x=x, y=y)
+        yield step(9, 0.6, P=P)
+        if P < 0:
+            P += 2*dy
+            yield step(10, 0.5, P=P)
+        else:
+            y += 1
+            yield step(12, 0.4, y=y)
+            P += 2*dy - 2*dx
+            yield step(13, 0.5, P=P)
+        x += 1
+        yield step(14, 0.5, x=x)
+
+
+def iter_wu(x0, y0, x1, y1, color=WHITE):
+    """Xiaolin Wu line; each plotted pixel carries its coverage."""
+    x0, y0, x1, y1 = float(x0), float(y0), float(x1), float(y1)
+
+    step = _Counter()
+    steep = abs(y1 - y0) > abs(x1 - x0)
+    yield step(2, 0.4, steep=steep)
+    if steep:
+        x0, y0, x1, y1 = y0, x0, y1, x1
+        yield step(3, 0.3)
+    if x0 > x1:
+        x0, y0, x1, y1 = x1, y1, x0, y0
+        yield step(4, 0.3)
+    dx = x1 - x0
+    gradient = (y1 - y0) / dx if dx != 0 else 1.0
+    yield step(5, 0.4, gradient=gradient)
+    xs, xe = math.floor(x0 + 0.5), math.floor(x1 + 0.5)
+    yield step(6, 0.3, xs=xs, xe=xe)
+
+    def plot(x, y, coverage):
+        return (y, x, color, coverage) if steep else (x, y, color, coverage)
+
+    def endpoint(xend, x, y, gap):
+        yend = y + gradient * (xend - x)
+        base = math.floor(yend)
+        f = yend - base
+        return yend, [plot(xend, base, (1 - f) * gap), plot(xend, base + 1, f * gap)]
+
+    lead, tail = x0 + 0.5, x1 + 0.5
+    yend, pixels = endpoint(xs, x0, y0, 1 - (lead - math.floor(lead)))
+    intery = yend + gradient
+    yield step(7, 0.5, pixels, intery=intery)
+    for x in range(xs + 1, xe):
+        base = math.floor(intery)
+        f = intery - base
+        yield step(9, 0.4, [plot(x, base, 1 - f)], x=x, intery=intery)
+        yield step(10, 0.4, [plot(x, base + 1, f)])
+        intery += gradient
+        yield step(11, 0.3, intery=intery)
+    _, pixels = endpoint(xe, x1, y1, tail - math.floor(tail))
+    yield step(13, 0.5, pixels)
+
+
+def iter_circle(xc, yc, r, color=BLUE, size=None):
+    """
+    size=(rows, cols) clips to that grid: off-grid octants are left out
+    and steps with none on the grid are jumped over.
+    """
+    x = 0
+    y = r
+    d = 1 - r
+    visible = None
+    if size is not None:
+        xs, ys, visible = clip_circle(xc, yc, r, *size)
+        drawn = np.flatnonzero(visible.any(axis=1))
+        if not drawn.size:
+            return
+        x, y = int(xs[drawn[0]]), int(ys[drawn[0]])
+        d = int(circle_decision(x, y, r))
+
+    step = _Counter()
+    while x <= y:
+        if visible is not None and not visible[x].any():
+            later = drawn[drawn > x]
+            if not later.size:
+                break
+            x, y = int(xs[later[0]]), int(ys[later[0]])
+            d = int(circle_decision(x, y, r))
+
+        yield step(3, 0.3, x=x, y=y, P=d)
+        octants = [
+            (xc + x, yc + y), (xc - x, yc + y), (xc + x, yc - y), (xc - x, yc - y),
+            (xc + y, yc + x), (xc - y, yc + x), (xc + y, yc - x), (xc - y, yc - x),
+        ]
+        for octant, (px, py) in enumerate(octants):
+            if visible is None or visible[x, octant]:
+                yield step(4 + octant, 0.2, [(px, py, color)])
+        yield step(12, 0.6, P=d)
+        if d < 0:
+            d += 2 * x + 3
+            yield step(13, 0.5, P=d)
+        else:
+            d += 2 * (x - y) + 5
+            yield step(15, 0.4, P=d)
+            y -= 1
+            yield step(16, 0.5, y=y)
+        x += 1
+        yield step(18, 0.5, x=x)
+
+
+def iter_ellipse_region1(xc, yc, rx, ry, color=WHITE, size=None):
+    """
+    Returns (x, y, rx2, ry2), the handoff region 2 starts from, once exhausted.
+    size=(rows, cols) clips to that grid like iter_circle; the handoff is
+    still the unclipped one.
+    """
+    x = 0
+    y = ry
+    rx2 = rx * rx
+    ry2 = ry * ry
+    d1 = ry2 - rx2 * ry + 0.25 * rx2
+    visible = None
+    if size is not None:
+        xs, ys, visible, handoff = clip_ellipse_region1(xc, yc, rx, ry, *size)
+        drawn = np.flatnonzero(visible.any(axis=1))
+        if not drawn.size:
+            return handoff
+        x, y = int(xs[drawn[0]]), int(ys[drawn[0]])
+        d1 = float(region1_decision(x, y, rx, ry))
+
+    step = _Counter()
+    while (2 * ry2 * x) < (2 * rx2 * y):
+        if visible is not None and not visible[x].any():
+            later = drawn[drawn > x]
+            if not later.size:
+                break
+            x, y = int(xs[later[0]]), int(ys[later[0]])
+            d1 = float(region1_decision(x, y, rx, ry))
+
+        yield step(6, 0.2, x=x, y=y, P=d1)
+        pixels = [(xc + x, yc + y), (xc - x, yc + y), (xc + x, yc - y), (xc - x, yc - y)]
+        shown = range(4) if visible is None else np.flatnonzero(visible[x])
+        yield step(7, 1.2, [(*pixels[q], color) for q in shown])
+        yield step(8, 0.4, P=d1)
+        if d1 < 0:
+            d1 += 2 * ry2 * x + 3 * ry2
+            yield step(9, 0.3, P=d1)
+        else:
+            y -= 1
+            yield step(11, 0.2, y=y)
+            d1 += 2 * ry2 * x - 2 * rx2 * y + 3 * ry2 + 2 * rx2
+            yield step(12, 0.3, P=d1)
+        x += 1
+        yield step(14, 0.3, x=x)
+    return (x, y, rx2, ry2) if size is None else handoff
+
+
+def iter_ellipse_region2(xc, yc, rx, ry, x, y, rx2, ry2, color=WHITE, size=None):
+    """size=(rows, cols) clips to that grid like iter_ellipse_region1."""
+    d2 = ry2 * (x + 0.5) * (x + 0.5) + rx2 * (y - 1) * (y - 1) - rx2 * ry2
+    visible = None
+    if size is not None:
+        x0, y0 = x, y
+        xs, ys, visible = clip_ellipse_region2(xc, yc, rx, ry, x, y, rx2, ry2, *size)
+        drawn = np.flatnonzero(visible.any(axis=1))
+        if not drawn.size:
+            return
+        x, y = int(xs[drawn[0]]), int(ys[drawn[0]])
+        d2 = float(region2_decision(x, y, x0, y0, rx2, ry2))
+
+    step = _Counter()
+    while y >= 0:
+        if visible is not None and not visible[y0 - y].any():
+            later = drawn[drawn > y0 - y]
+            if not later.size:
+                break
+            x, y = int(xs[later[0]]), int(ys[later[0]])
+            d2 = float(region2_decision(x, y, x0, y0, rx2, ry2))
+
+        yield step(4, 0.2, x=x, y=y, P=d2)
+        pixels = [(xc + x, yc + y), (xc - x, yc + y), (xc + x, yc - y), (xc - x, yc - y)]
+        shown = range(4) if visible is None else np.flatnonzero(visible[y0 - y])
+        yield step(5, 1.2, [(*pixels[q], color) for q in shown])
+        yield step(6, 0.4, P=d2)
+        if d2 > 0:
+            y -= 1
+            yield step(7, 0.2, y=y)
+            d2 += -2 * rx2 * y + 3 * rx2
+            yield step(8, 0.3, P=d2)
+        else:
+            x += 1
+            yield step(10, 0.2, x=x)
+            y -= 1
+            yield step(11, 0.2, y=y)
+            d2 += 2 * ry2 * x - 2 * rx2 * y + 3 * rx2 + 2 * ry2
+            yield step(12, 0.3, P=d2)
+
+
+def iter_boundary_fill(canvas, x, y, boundary, fill, color=BLUE):
+    """
+    Boundary fill over a 2-D array of colour values, indexed [x, y].
+
+    Works on a copy of canvas. Pushes and pops of the fill stack are
+    recorded as "push"/"pop" values so a player can mirror them on a
+    ManimStack.
+    """
+    canvas = np.array(canvas, copy=True)
+    rows, cols = canvas.shape
+
+    step = _Counter()
+    start = canvas[x, y] if 0 <= x < rows and 0 <= y < cols else boundary
+    if start == boundary or start == fill:
+        yield step(4, 0.0)
+        return
+
+    stack = [(x, y)]
+    yield step(1, 0.0, push=(x, y), depth=1)
+    while stack:
+        cx, cy = stack.pop()
+        yield step(2, 0.0, pop=(cx, cy), depth=len(stack))
+
+        current = canvas[cx, cy]
+        if current == boundary or current == fill or current != start:
+            yield step(4, 0.0)
+            continue
+
+        canvas[cx, cy] = fill
+        yield step(5, 0.3, [(cx, cy, color)])
+
+        neighbors = [(cx + 1, cy), (cx - 1, cy), (cx, cy + 1), (cx, cy - 1)]
+        for line, (nx, ny) in reversed(list(enumerate(neighbors, start=6))):
+            if not (0 <= nx < rows and 0 <= ny < cols):
+                continue
+            if canvas[nx, ny] != boundary and canvas[nx, ny] != fill and canvas[nx, ny] == start:
+                stack.append((nx, ny))
+                yield step(line, 0.0, push=(nx, ny), depth=len(stack))
+
+
+# ----------------------------------------------------------------------
+# Traces
+# ----------------------------------------------------------------------
+def run_stepper(steps):
+    """Drain a stepper: (list of its steps, what it returned)."""
+    recorded = []
+    while True:
+        try:
+            recorded.append(next(steps))
+        except StopIteration as done:
+            return recorded, done.value
+
+
+def dda_trace(x0, y0, x1, y1, color=BLUE, size=None):
+    return Trace("dda", DDA_CODE, list(iter_dda(x0, y0, x1, y1, color, size)))
+
+
+def bresenham_trace(x0, y0, x1, y1, color=BLUE, size=None):
+    return Trace("bresenham", BRESENHAM_CODE, list(iter_bresenham(x0, y0, x1, y1, color, size)))
+
+
+def wu_trace(x0, y0, x1, y1, color=WHITE):
+    return Trace("wu", WU_CODE, list(iter_wu(x0, y0, x1, y1, color)))
+
+
+def circle_trace(xc, yc, r, color=BLUE, size=None):
+    return Trace("circle", CIRCLE_CODE, list(iter_circle(xc, yc, r, color, size)))
+
+
+def ellipse_region1_trace(xc, yc, rx, ry, color=WHITE, size=None):
+    """Returns (trace, (x, y, rx2, ry2)) — the handoff region 2 starts from."""
+    steps, handoff = run_stepper(iter_ellipse_region1(xc, yc, rx, ry, color, size))
+    return Trace("ellipse_region1", ELLIPSE_REGION1_CODE, steps), handoff
+
+
+def ellipse_region2_trace(xc, yc, rx, ry, x, y, rx2, ry2, color=WHITE, size=None):
+    steps = iter_ellipse_region2(xc, yc, rx, ry, x, y, rx2, ry2, color, size)
+    return Trace("ellipse_region2", ELLIPSE_REGION2_CODE, list(steps))
+
+
+def boundary_fill_trace(canvas, x, y, boundary, fill, color=BLUE):
+    steps = iter_boundary_fill(canvas, x, y, boundary, fill, color)
+    return Trace("boundary_fill", BOUNDARY_FILL_CODE, list(steps))
+
+
+# ----------------------------------------------------------------------
+# Cache on disk
+# ----------------------------------------------------------------------
+def _plain(value):
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"can't store {type(value).__name__} in a trace")
+
+
+def save_trace(trace, path):
+    with open(path, "w") as f:
+        json.dump({
+            "algorithm": trace.algorithm,
+            "code": trace.code,
+            "steps": [step._asdict() for step in trace.steps],
+        }, f, default=_plain)
+
+
+def load_trace(path):
+    with open(path) as f:
+        data = json.load(f)
+    steps = [
+        Step(s["index"], s["line"], s["values"], tuple(tuple(p) for p in s["pixels"]), s["wait"])
+        for s in data["steps"]
+    ]
+    return Trace(data["algorithm"], data["code"], steps)
@@ -0,0 +1,190 @@
+"""
+Micro-benchmarks for the raster algorithms — no manim needed.
+
+Times the decision loops from Rasterlib (the scenes' arithmetic with the
+drawing stripped out) and their NumPy closed forms at growing sizes: line
+length, circle radius, ellipse radii and filled region or polygon area. Workloads come
+from a seeded generator, so two runs with the same --seed time the same
+primitives and results can be compared across commits.
+
+    python bench.py                         # writes bench.json
+    python bench.py --quick -o new.json
+    python bench.py -o new.json --compare bench.json   # flags slowdowns vs a baseline
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+from Rasterlib import (
+    bresenham_batch, bresenham_reference, boundary_fill_reference,
+    circle_batch, circle_reference, dda_batch, dda_reference,
+    ellipse_batch, ellipse_reference, scanline_fill_reference,
+    polygon_fill, polygon_fill_reference, wu_batch, wu_reference,
+)
+
+SIZES = {
+    "line":    [16, 64, 256, 1024],      # length along the major axis
+    "circle":  [8, 32, 128, 512],        # radius
+    "ellipse": [8, 32, 128, 512],        # rx, with ry = rx // 2
+    "fill":    [8, 16, 32, 64],          # side of the square region
+}
+QUICK_SIZES = {name: sizes[:2] for name, sizes in SIZES.items()}
+
+
+def _time(fn, repeats):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times), statistics.median(times)
+
+
+def _lines(rng, length, count):
+    x0, y0 = rng.integers(-1000, 1000, (2, count))
+    dy = rng.integers(0, length + 1, count)   # first octant, so Bresenham applies too
+    return x0, y0, x0 + length, y0 + dy
+
+
+def _region(rng, side, density=0.1):
+    """White-bordered square with seeded white specks inside, as in the Boundary scene."""
+    canvas = np.zeros((side + 2, side + 2), dtype=np.uint8)
+    canvas[[0, -1], :] = canvas[:, [0, -1]] = 1
+    canvas[1:-1, 1:-1] = rng.random((side, side)) < density
+    canvas[1, 1] = 0
+    return canvas.tolist()
+
+
+def _polygon(rng, side, n=8):
+    """Seeded star-shaped n-gon spanning a side x side square."""
+    angles = np.sort(rng.uniform(0, 2 * np.pi, n))
+    radii = side / 2 * rng.uniform(0.5, 1, n)
+    points = side / 2 + np.column_stack([radii * np.cos(angles), radii * np.sin(angles)])
+    return np.rint(points).astype(int).tolist()
+
+
+def workloads(rng, sizes, count):
+    """Yield (algorithm, impl, size, run) where run() returns the pixel count."""
+    for length in sizes["line"]:
+        x0, y0, x1, y1 = _lines(rng, length, count)
+        args = list(zip(x0.tolist(), y0.tolist(), x1.tolist(), y1.tolist()))
+        yield "dda", "loop", length, lambda args=args: sum(len(dda_reference(*a)) for a in args)
+        yield "dda", "numpy", length, lambda a=(x0, y0, x1, y1): dda_batch(*a).xs.size
+        yield "bresenham", "loop", length, lambda args=args: sum(len(bresenham_reference(*a)) for a in args)
+        yield "bresenham", "numpy", length, lambda a=(x0, y0, x1, y1): bresenham_batch(*a).xs.size
+        yield "wu", "loop", length, lambda args=args: sum(len(wu_reference(*a)) for a in args)
+        yield "wu", "numpy", length, lambda a=(x0, y0, x1, y1): wu_batch(*a).xs.size
+
+    for r in sizes["circle"]:
+        xc, yc = rng.integers(-1000, 1000, (2, count))
+        radii = r + rng.integers(0, max(r // 8, 1), count)
+        args = list(zip(xc.tolist(), yc.tolist(), radii.tolist()))
+        yield "circle", "loop", r, lambda args=args: sum(len(circle_reference(*a)) for a in args)
+        yield "circle", "numpy", r, lambda a=(xc, yc, radii): circle_batch(*a).xs.size
+
+    for rx in sizes["ellipse"]:
+        xc, yc = rng.integers(-1000, 1000, (2, count))
+        rxs = rx + rng.integers(0, max(rx // 8, 1), count)
+        rys = rxs // 2
+        args = list(zip(xc.tolist(), yc.tolist(), rxs.tolist(), rys.tolist()))
+        yield "ellipse", "loop", rx, lambda args=args: sum(len(ellipse_reference(*a)) for a in args)
+        yield "ellipse", "numpy", rx, lambda a=(xc, yc, rxs, rys): ellipse_batch(*a).xs.size
+
+    for side in sizes["fill"]:
+        regions = [_region(rng, side) for _ in range(max(count // side, 1))]
+        yield "boundary_fill", "loop", side * side, \
+            lambda regions=regions: sum(len(boundary_fill_reference(c, 1, 1, 1, 2)) for c in regions)
+        yield "scanline_fill", "loop", side * side, \
+            lambda regions=regions: sum(len(scanline_fill_reference(c, 1, 1, 1, 2)) for c in regions)
+
+    # Drawn after every region, so the fill workloads stay those of older baselines
+    for side in sizes["fill"]:
+        polygons = [_polygon(rng, side) for _ in range(max(count // side, 1))]
+        yield "polygon_fill", "loop", side * side, \
+            lambda polygons=polygons: sum(len(polygon_fill_reference(p)) for p in polygons)
+        yield "polygon_fill", "numpy", side * side, \
+            lambda polygons=polygons: sum(polygon_fill(p)[0].size for p in polygons)
+
+
+def _commit():
+    try:
+        result = subprocess.run(["git", "rev-parse", "--short", "HEAD"],
+                                capture_output=True, text=True, check=True)
+        return result.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(sizes=SIZES, count=200, repeats=5, seed=0):
+    rng = np.random.default_rng(seed)
+    results = []
+    for algorithm, impl, size, fn in workloads(rng, sizes, count):
+        pixels = fn()   # warm-up, and the pixel count for throughput
+        best, median = _time(fn, repeats)
+        results.append({
+            "algorithm": algorithm, "impl": impl, "size": size,
+            "pixels": pixels, "best_s": best, "median_s": median,
+            "mpixels_per_s": pixels / best / 1e6 if best > 0 else None,
+        })
+        print(f"{algorithm:>14} {impl:>5} {size:>6}  {best * 1e3:9.3f} ms  {pixels:>9} px")
+    return {
+        "meta": {
+            "commit": _commit(), "seed": seed, "count": count, "repeats": repeats,
+            "python": platform.python_version(), "numpy": np.__version__,
+            "machine": platform.machine(),
+        },
+        "results": results,
+    }
+
+
+def compare(report, baseline, threshold=1.10):
+    """Print best-time ratios against baseline; return how many got slower than threshold."""
+    old = {(r["algorithm"], r["impl"], r["size"]): r["best_s"] for r in baseline["results"]}
+    regressions = 0
+    for r in report["results"]:
+        key = (r["algorithm"], r["impl"], r["size"])
+        if key not in old or not old[key]:
+            continue
+        ratio = r["best_s"] / old[key]
+        flag = "  <-- slower" if ratio > threshold else ""
+        regressions += ratio > threshold
+        print(f"{key[0]:>14} {key[1]:>5} {key[2]:>6}  x{ratio:5.2f}{flag}")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("-o", "--output", default="bench.json")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--count", type=int, default=200, help="primitives per size")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--quick", action="store_true", help="only the two smallest sizes")
+    parser.add_argument("--compare", metavar="BASELINE", help="earlier bench JSON to compare with")
+    parser.add_argument("--threshold", type=float, default=1.10,
+                        help="slowdown ratio that counts as a regression")
+    args = parser.parse_args()
+
+    # Read the baseline first: writing the report could replace it
+    baseline = None
+    if args.compare:
+        if os.path.realpath(args.compare) == os.path.realpath(args.output):
+            parser.error("--output would overwrite the --compare baseline; write the new run elsewhere")
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+    report = run(QUICK_SIZES if args.quick else SIZES, args.count, args.repeats, args.seed)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {args.output}")
+
+    if baseline is not None:
+        if baseline["meta"].get("seed") != args.seed:
+            print("Warning: baseline used a different seed")
+        sys.exit(1 if compare(report, baseline, args.threshold) else 0)
@@ -1,71 +1,251 @@
-import subprocess
+import argparse
+import ast
+import hashlib
+import json
 import os
+import subprocess
+from concurrent.futures import Future, ThreadPoolExecutor
+from importlib import metadata
 from pathlib import Path
 
-def concatenate_videos(video_paths, output_name="combined_rasters.mp4"):
+# Scenes in playlist order: (module, scene class). The longest scenes are
+# listed as sections that each start from the frame the previous one ends
+# on, so they render in parallel and the concat stitches them back into one
+SCENES = [
+    ("Boundary.py",  "BoundaryPart1"),
+    ("Boundary.py",  "BoundaryPart2"),
+    ("Boundary.py",  "BoundaryPart3"),
+    ("Circle.py",    "GridCircle"),
+    ("Ellipse.py",   "GridEllipseRegion1"),
+    ("Ellipse.py",   "GridEllipseRegion2"),
+    ("Line.py",      "GridLine"),
+    ("dda_manim.py", "GridLine"),
+]
+
+# manim -q<flag> → folder it renders into
+QUALITIES = {
+    "l": "480p15",
+    "m": "720p30",
+    "h": "1080p60",
+    "p": "1440p60",
+    "k": "2160p60",
+}
+
+# What every video in media/ was built from, so unchanged scenes are skipped
+MANIFEST = Path("media", "raster_manifest.json")
+
+def video_path(module, scene, quality="h"):
+    return Path("media", "videos", Path(module).stem, QUALITIES[quality], f"{scene}.mp4")
+
+def local_deps(module, seen=None):
+    """module plus every repo module it imports, directly or not."""
+    seen = set() if seen is None else seen
+    if module in seen:
+        return seen
+    seen.add(module)
+    for node in ast.walk(ast.parse(Path(module).read_text(encoding="utf-8"))):
+        if isinstance(node, ast.Import):
+            names = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.module:
+            names = [node.module]
+        else:
+            continue
+        for name in names:
+            path = Path(module).parent / f"{name}.py"
+            if path.exists():
+                local_deps(str(path), seen)
+    return seen
+
+def manim_version():
+    try:
+        return metadata.version("manim")
+    except metadata.PackageNotFoundError:
+        return "unknown"
+
+def scene_key(module, scene, quality="h"):
     """
-    Concatenate multiple video files using ffmpeg
+    Hash of everything a scene's video depends on: the source of its
+    module and the local modules it imports (the algorithm parameters are
+    literals in that source), the scene name, quality and manim version.
     """
-    # Check if all files exist
-    valid_videos = []
-    for video in video_paths:
-        if os.path.exists(video):
-            valid_videos.append(video)
-            print(f"✓ Found: {os.path.basename(video)}")
-        else:
-            print(f"✗ Warning: {video} not found")
-    
-    if not valid_videos:
-        print("No valid videos found!")
-        return False
-    
-    # Create file list for ffmpeg
-    with open('file_list.txt', 'w') as f:
-        for video in valid_videos:
-            f.write(f"file '{os.path.abspath(video)}'\n")
-    
-    # Run ffmpeg concatenation
+    digest = hashlib.sha256(repr((scene, quality, manim_version())).encode("utf-8"))
+    for dep in sorted(local_deps(module)):
+        digest.update(dep.encode("utf-8"))
+        digest.update(Path(dep).read_bytes())
+    return digest.hexdigest()
+
+def load_manifest():
+    try:
+        with open(MANIFEST) as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+def save_manifest(manifest):
+    MANIFEST.parent.mkdir(parents=True, exist_ok=True)
+    tmp = MANIFEST.with_suffix(".tmp")
+    tmp.write_text(json.dumps(manifest, indent=2, sort_keys=True))
+    os.replace(tmp, MANIFEST)
+
+def render_scene(module, scene, quality="h"):
+    """Render one scene in its own manim process and return the video path."""
+    cmd = ['manim', f'-q{quality}', module, scene]
+    print(f"🎞️  Rendering {module} {scene}...")
+    subprocess.run(cmd, check=True, capture_output=True, text=True)
+    print(f"✓ Rendered: {module} {scene}")
+    return video_path(module, scene, quality)
+
+def render_all(scenes, quality="h", workers=None, manifest=None, force=False):
+    """
+    Start every render at once, at most `workers` manim processes at a time,
+    and yield the finished videos in playlist order. The caller can consume
+    the first video while later ones are still rendering.
+
+    With a manifest (see load_manifest), scenes whose scene_key matches the
+    one their existing video was built from are not rendered again
+    (unless force is set), and the manifest is updated and saved as each
+    render lands.
+    """
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        futures = []
+        for module, scene in scenes:
+            name = f"{module}:{scene}:{quality}"
+            key = scene_key(module, scene, quality)
+            path = video_path(module, scene, quality)
+            if not force and manifest is not None and manifest.get(name) == key and path.exists():
+                print(f"✓ Up to date: {module} {scene}")
+                future = Future()
+                future.set_result(path)
+                futures.append((name, key, future))
+            else:
+                futures.append((name, key, pool.submit(render_scene, module, scene, quality)))
+        try:
+            for name, key, future in futures:
+                path = future.result()
+                if manifest is not None and manifest.get(name) != key:
+                    manifest[name] = key
+                    save_manifest(manifest)
+                yield path
+        except BaseException:
+            for _, _, future in futures:
+                future.cancel()
+            raise
+
+def probe(video):
+    """Stream parameters that must match for a -c copy concat."""
     cmd = [
-        'ffmpeg',
-        '-f', 'concat',
-        '-safe', '0',
-        '-i', 'file_list.txt',
-        '-c', 'copy',  # Copy without re-encoding (fast)
-        '-y',  # Overwrite output if exists
-        output_name
+        'ffprobe', '-v', 'error',
+        '-select_streams', 'v:0',
+        '-show_entries', 'stream=codec_name,width,height,pix_fmt,r_frame_rate',
+        '-of', 'json',
+        str(video),
     ]
-    
-    print(f"\n🎬 Concatenating {len(valid_videos)} videos...")
+    result = subprocess.run(cmd, check=True, capture_output=True, text=True)
+    try:
+        stream = json.loads(result.stdout)["streams"][0]
+        return (stream["codec_name"], stream["width"], stream["height"],
+                stream["pix_fmt"], stream["r_frame_rate"])
+    except (ValueError, KeyError, IndexError):
+        raise ValueError(f"{video}: ffprobe found no usable video stream") from None
+
+def concatenate_videos(video_paths, output_name="combined_rasters.mp4"):
+    """
+    Concatenate videos with ffmpeg, without re-encoding.
+
+    video_paths may be a generator (see render_all): each video is remuxed
+    to MPEG-TS and piped into a single ffmpeg writing output_name as soon
+    as it arrives, so the concat runs alongside the remaining renders.
+    Every video is probed first and must match the first one's codec,
+    size, pixel format and frame rate, otherwise -c copy would produce a
+    broken file. ffmpeg writes to a temporary file next to output_name,
+    which only replaces it once every video made it in, so a failed build
+    leaves the last good output untouched.
+    """
+    root, ext = os.path.splitext(output_name)
+    partial = f"{root}.partial{ext}"
+    sink = subprocess.Popen(
+        ['ffmpeg', '-v', 'error', '-f', 'mpegts', '-i', 'pipe:0',
+         '-c', 'copy', '-y', partial],
+        stdin=subprocess.PIPE,
+    )
+    reference = None
+    count = 0
     try:
-        result = subprocess.run(cmd, check=True, capture_output=True, text=True)
-        print(f"✅ Successfully created: {output_name}")
-        return True
-    except subprocess.CalledProcessError as e:
+        for video in video_paths:
+            if not os.path.exists(video):
+                raise FileNotFoundError(f"{video} not found")
+
+            params = probe(video)
+            if reference is None:
+                reference = params
+            elif params != reference:
+                raise ValueError(f"{video} is {params}, expected {reference}; cannot concat with -c copy")
+
+            print(f"✓ Appending: {video}")
+            subprocess.run(
+                ['ffmpeg', '-v', 'error', '-i', str(video), '-c', 'copy', '-f', 'mpegts', 'pipe:1'],
+                stdout=sink.stdin, check=True,
+            )
+            count += 1
+
+        sink.stdin.close()
+        if sink.wait() != 0:
+            raise subprocess.CalledProcessError(sink.returncode, sink.args)
+    except (OSError, ValueError, subprocess.CalledProcessError) as e:
+        sink.kill()
+        sink.wait()
+        if os.path.exists(partial):
+            os.remove(partial)
         print(f"❌ Error: {e}")
-        print(f"Error output: {e.stderr}")
+        if getattr(e, "stderr", None):
+            print(f"Error output: {e.stderr}")
         return False
-    finally:
-        # Clean up temporary file
-        if os.path.exists('file_list.txt'):
-            os.remove('file_list.txt')
-
-# Define the videos you want to concatenate (in order)
-# Adjust paths based on your actual folder structure
-videos_to_concat = [
-    "media/videos/Boundary/1080p60/Boundary.mp4",
-    "media/videos/Circle/1080p60/GridCircle.mp4",
-    "media/videos/Ellipse/1080p60/GridEllipse.mp4",
-    "media/videos/Line/1080p60/GridLine.mp4",
-]
 
-# Also check if dda_manim has a video
-dda_video = "media/videos/dda_manim/1080p60/GridLine.mp4"
-if os.path.exists(dda_video):
-    videos_to_concat.append(dda_video)
+    if count == 0:
+        if os.path.exists(partial):
+            os.remove(partial)
+        print("No valid videos found!")
+        return False
+    os.replace(partial, output_name)
+    print(f"✅ Successfully created: {output_name} from {count} videos")
+    return True
 
-# Run the concatenation
+# Run the build
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Render every raster scene and concatenate them.")
+    parser.add_argument("-q", "--quality", choices=sorted(QUALITIES), default="h")
+    parser.add_argument("-j", "--workers", type=int, default=None,
+                        help="parallel manim processes (default: one per CPU)")
+    parser.add_argument("--no-render", action="store_true",
+                        help="concatenate the videos already in media/ instead of rendering")
+    parser.add_argument("--force", action="store_true",
+                        help="ignore the build manifest and render everything")
+    parser.add_argument("-o", "--output", default="all_rasters_combined.mp4")
+    args = parser.parse_args()
+
     print("=" * 50)
-    print("Concatenating Raster Manim Videos")
+    print("Rendering and Concatenating Raster Manim Videos")
     print("=" * 50)
-    concatenate_videos(videos_to_concat, "all_rasters_combined.mp4")
+    if args.no_render:
+        concatenate_videos([video_path(module, scene, args.quality) for module, scene in SCENES], args.output)
+    else:
+        # --force skips the up-to-date checks but keeps the entries for
+        # other qualities and outputs
+        manifest = load_manifest()
+
+        # The combined video is stale iff any scene in it is
+        playlist = hashlib.sha256()
+        for module, scene in SCENES:
+            playlist.update(scene_key(module, scene, args.quality).encode("utf-8"))
+        playlist_key = playlist.hexdigest()
+        up_to_date = not args.force and (
+            manifest.get(f"output:{args.output}") == playlist_key
+            and os.path.exists(args.output)
+            and all(video_path(module, scene, args.quality).exists() for module, scene in SCENES)
+        )
+
+        if up_to_date:
+            print(f"✅ Nothing changed, {args.output} is up to date")
+        elif concatenate_videos(render_all(SCENES, args.quality, args.workers, manifest, args.force), args.output):
+            manifest[f"output:{args.output}"] = playlist_key
+            save_manifest(manifest)
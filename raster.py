@@ -0,0 +1,251 @@
+"""
+Headless rasterizer — runs the repo's algorithms with no manim involved.
+
+Each command rasterizes one primitive with Rasterlib's closed forms onto a
+canvas and writes it as PNG, PPM or NPY, picked by the output extension.
+Canvas pixel (x, y) uses the scenes' convention: x to the right, y up.
+
+    python -m raster bresenham 1 1 40 20 -o line.png
+    python -m raster circle 32 32 20 --size 64 64 -o circle.ppm
+    python -m raster ellipse 35 20 12 8 -o ellipse.npy
+    python -m raster fill 2 2 --rect 0 0 5 4 -o fill.png
+    python -m raster --batch jobs.txt        # one command per line, "-" for stdin
+
+PNG and PPM are images (top row = highest y); NPY is the uint8 canvas
+itself, indexed [x, y] like Rasterlib's fill references. Drawn pixels are
+255 (Wu lines: coverage * 255), fill regions 128 over a 255 boundary.
+
+Batch files are read and run one line at a time, so results stream: each
+job prints one JSON line as soon as its file is written, and a failing
+job is reported without stopping the rest.
+"""
+import argparse
+import io
+import json
+import shlex
+import struct
+import sys
+import zlib
+from contextlib import redirect_stderr, redirect_stdout
+
+import numpy as np
+
+from Rasterlib import (
+    boundary_fill_reference, bresenham, dda, midpoint_circle, midpoint_ellipse,
+    polygon_fill, scanline_fill_reference, wu,
+)
+
+FOREGROUND = 255
+FILL = 128
+
+
+# ----------------------------------------------------------------------
+# Writers
+# ----------------------------------------------------------------------
+def _image(canvas):
+    """[x, y] canvas -> image rows, top row first."""
+    return np.ascontiguousarray(canvas.T[::-1])
+
+
+def _chunk(tag, data):
+    return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data))
+
+
+def write_png(path, canvas):
+    """8-bit greyscale PNG, written with zlib alone."""
+    image = _image(canvas)
+    height, width = image.shape
+    # Every scanline starts with filter byte 0 (None)
+    raw = np.hstack([np.zeros((height, 1), dtype=np.uint8), image]).tobytes()
+    with open(path, "wb") as f:
+        f.write(b"\x89PNG\r\n\x1a\n")
+        f.write(_chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 0, 0, 0, 0)))
+        f.write(_chunk(b"IDAT", zlib.compress(raw, 6)))
+        f.write(_chunk(b"IEND", b""))
+
+
+def write_ppm(path, canvas):
+    """Binary (P6) PPM, grey in all three channels."""
+    image = _image(canvas)
+    height, width = image.shape
+    with open(path, "wb") as f:
+        f.write(f"P6\n{width} {height}\n255\n".encode("ascii"))
+        f.write(np.repeat(image[..., None], 3, axis=2).tobytes())
+
+
+def write_npy(path, canvas):
+    np.save(path, canvas)
+
+
+WRITERS = {".png": write_png, ".ppm": write_ppm, ".npy": write_npy}
+
+
+def writer_for(path):
+    for suffix, writer in WRITERS.items():
+        if path.lower().endswith(suffix):
+            return writer
+    raise ValueError(f"{path}: output must end in {', '.join(WRITERS)}")
+
+
+# ----------------------------------------------------------------------
+# Rasterizing
+# ----------------------------------------------------------------------
+def _canvas(size, xs, ys):
+    """Blank canvas of the given size, or just big enough for the pixels."""
+    if size is not None:
+        rows, cols = size
+    else:
+        rows = int(xs.max(initial=-1)) + 1
+        cols = int(ys.max(initial=-1)) + 1
+    return np.zeros((max(rows, 1), max(cols, 1)), dtype=np.uint8)
+
+
+def _plot(canvas, xs, ys, values):
+    """Write values at (xs, ys), dropping off-canvas pixels; overlaps keep the brightest."""
+    values = np.broadcast_to(np.asarray(values, dtype=np.uint8), xs.shape)
+    inside = (0 <= xs) & (xs < canvas.shape[0]) & (0 <= ys) & (ys < canvas.shape[1])
+    np.maximum.at(canvas, (xs[inside], ys[inside]), values[inside])
+    return int(inside.sum())
+
+
+def _fill(args):
+    if args.input:
+        canvas = np.load(args.input).astype(np.uint8)
+    else:
+        corners = np.array(args.rect or [[0, 0, 0, 0]])
+        size = args.size or (int(corners[:, [0, 2]].max()) + 1, int(corners[:, [1, 3]].max()) + 1)
+        canvas = np.zeros(size, dtype=np.uint8)
+    rows, cols = canvas.shape
+    for x1, y1, x2, y2 in args.rect or []:
+        # Negative corners would wrap around in the slices below
+        if not (0 <= x1 <= x2 < rows and 0 <= y1 <= y2 < cols):
+            raise ValueError(f"--rect {x1} {y1} {x2} {y2}: need 0 <= x1 <= x2 < {rows} and 0 <= y1 <= y2 < {cols}")
+        # Boundary.rectangle: the four edges, corners included
+        canvas[x1:x2 + 1, [y1, y2]] = FOREGROUND
+        canvas[[x1, x2], y1:y2 + 1] = FOREGROUND
+
+    reference = scanline_fill_reference if args.mode == "span" else boundary_fill_reference
+    pixels = reference(canvas.tolist(), args.x, args.y, FOREGROUND, FILL)
+    if pixels:
+        xs, ys = np.array(pixels).T
+        canvas[xs, ys] = FILL
+    return canvas, len(pixels)
+
+
+def rasterize(args):
+    """(canvas, pixel count) for one parsed command."""
+    if args.algorithm == "fill":
+        return _fill(args)
+
+    values = FOREGROUND
+    if args.algorithm == "dda":
+        xs, ys = dda(args.x0, args.y0, args.x1, args.y1)
+    elif args.algorithm == "bresenham":
+        xs, ys = bresenham(args.x0, args.y0, args.x1, args.y1)
+    elif args.algorithm == "wu":
+        xs, ys, coverage = wu(args.x0, args.y0, args.x1, args.y1)
+        values = np.rint(coverage * FOREGROUND)
+    elif args.algorithm == "circle":
+        xs, ys = midpoint_circle(args.xc, args.yc, args.r)
+    elif args.algorithm == "ellipse":
+        xs, ys = midpoint_ellipse(args.xc, args.yc, args.rx, args.ry)
+    else:
+        xs, ys = polygon_fill(np.array(args.vertices).reshape(-1, 2))
+
+    canvas = _canvas(args.size, xs, ys)
+    return canvas, _plot(canvas, xs, ys, values)
+
+
+# ----------------------------------------------------------------------
+# Command line
+# ----------------------------------------------------------------------
+def make_parser():
+    parser = argparse.ArgumentParser(prog="python -m raster", description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--batch", metavar="FILE", help="run one command per line of FILE ('-' for stdin)")
+    commands = parser.add_subparsers(dest="algorithm", metavar="algorithm")
+
+    def command(name, help, *coords, kind=int):
+        sub = commands.add_parser(name, help=help)
+        for coord in coords:
+            sub.add_argument(coord, type=kind)
+        sub.add_argument("-o", "--output", required=True, help="file.png, file.ppm or file.npy")
+        sub.add_argument("--size", type=int, nargs=2, metavar=("ROWS", "COLS"),
+                         help="canvas size along x and y (default: fit the pixels)")
+        return sub
+
+    command("dda", "DDA line", "x0", "y0", "x1", "y1")
+    command("bresenham", "Bresenham line (x1 >= x0)", "x0", "y0", "x1", "y1")
+    command("wu", "Xiaolin Wu anti-aliased line", "x0", "y0", "x1", "y1", kind=float)
+    command("circle", "midpoint circle", "xc", "yc", "r")
+    command("ellipse", "midpoint ellipse", "xc", "yc", "rx", "ry")
+    polygon = command("polygon", "scanline polygon fill")
+    polygon.add_argument("vertices", type=int, nargs="+", metavar="X Y", help="vertex coordinates")
+    fill = command("fill", "boundary fill from seed (x, y)", "x", "y")
+    fill.add_argument("--rect", type=int, nargs=4, action="append", metavar=("X1", "Y1", "X2", "Y2"),
+                      help="draw a boundary rectangle first (repeatable)")
+    fill.add_argument("--input", help="start from a uint8 .npy canvas, 255 = boundary")
+    fill.add_argument("--mode", choices=["pixel", "span"], default="pixel",
+                      help="4-connected stack fill or scanline span fill (same pixels)")
+    return parser
+
+
+def run(args):
+    """
+    Rasterize and write one job; returns its JSON-able result. "pixels" is
+    the number of pixel writes that landed on the canvas.
+    """
+    write = writer_for(args.output)
+    if args.algorithm == "polygon" and len(args.vertices) % 2:
+        raise ValueError("polygon needs an even number of coordinates")
+    canvas, count = rasterize(args)
+    write(args.output, canvas)
+    return {"algorithm": args.algorithm, "output": args.output, "pixels": count,
+            "size": list(canvas.shape)}
+
+
+def run_batch(parser, lines, out=sys.stdout):
+    """Run every non-blank, non-# line as a command; returns how many failed."""
+    failed = 0
+    for number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        # argparse prints help and usage errors itself; keep them out of the JSON stream
+        messages = io.StringIO()
+        try:
+            with redirect_stdout(messages), redirect_stderr(messages):
+                args = parser.parse_args(shlex.split(line))
+            if not args.algorithm:
+                raise ValueError(f"no algorithm given: {line}")
+            result = {"line": number, **run(args)}
+        except SystemExit:
+            detail = messages.getvalue().strip().splitlines()
+            reason = detail[-1].split("error: ", 1)[-1] if detail and "error: " in detail[-1] else "bad command"
+            result = {"line": number, "error": f"{reason}: {line}"}
+        except (ValueError, ZeroDivisionError, OSError, IndexError) as e:
+            result = {"line": number, "error": str(e)}
+        failed += "error" in result
+        print(json.dumps(result), file=out, flush=True)
+    return failed
+
+
+def main(argv=None):
+    parser = make_parser()
+    args = parser.parse_args(argv)
+    if args.batch:
+        if args.batch == "-":
+            return 1 if run_batch(parser, sys.stdin) else 0
+        with open(args.batch) as f:
+            return 1 if run_batch(parser, f) else 0
+    if not args.algorithm:
+        parser.error("give an algorithm or --batch")
+    try:
+        print(json.dumps(run(args)))
+    except (ValueError, ZeroDivisionError, OSError, IndexError) as e:
+        print(f"raster: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())